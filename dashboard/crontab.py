@@ -3,14 +3,20 @@
 import logging
 import os
 import subprocess
+import threading
 from pathlib import Path
 
 import yaml
 
 from .utils.envfile import parse_env_line
+from .utils.yamlfile import dump_yaml, load_yaml
 
 ENV_FILE = "/app/.cron.env"
 
+# Serializes scheduler reloads (settings saves and the restart endpoints) so
+# overlapping calls don't race on the crontab file or killall/crond
+_reload_lock = threading.Lock()
+
 DEFAULT_CONFIG = {
     "immich": {
         "url": "${IMMICH_URL}",
@@ -159,7 +165,7 @@ def ensure_config(config_path: str = "/app/config.yaml"):
         # notification windows and the scheduler never fires.
         try:
             with open(path) as f:
-                if yaml.safe_load(f) is not None:
+                if load_yaml(f) is not None:
                     return
         except yaml.YAMLError:
             log.warning(f"{config_path} contains invalid YAML — leaving it untouched")
@@ -178,7 +184,7 @@ def ensure_config(config_path: str = "/app/config.yaml"):
 
     path.parent.mkdir(parents=True, exist_ok=True)
     with open(path, "w") as f:
-        yaml.dump(DEFAULT_CONFIG, f, default_flow_style=False, allow_unicode=True, sort_keys=False)
+        dump_yaml(DEFAULT_CONFIG, f)
 
 
 def dump_env():
@@ -214,7 +220,7 @@ def generate_crontab(config_path: str = "/app/config.yaml"):
     path = Path(config_path)
     if path.is_file():
         with open(config_path) as f:
-            config = yaml.safe_load(f) or {}
+            config = load_yaml(f) or {}
     else:
         config = {}
     windows = config.get("settings", {}).get("notification_windows", [])
@@ -227,7 +233,8 @@ def generate_crontab(config_path: str = "/app/config.yaml"):
 
 
 def reload_scheduler(config_path: str = "/app/config.yaml"):
-    """Regenerate crontab and restart crond."""
-    generate_crontab(config_path)
-    subprocess.run(["killall", "crond"], check=False)
-    subprocess.run(["crond", "-l", "2"], check=False)
+    """Regenerate crontab and restart crond (one reload at a time)."""
+    with _reload_lock:
+        generate_crontab(config_path)
+        subprocess.run(["killall", "crond"], check=False)
+        subprocess.run(["crond", "-l", "2"], check=False)
@@ -4,19 +4,23 @@ Immich Memories Notify - Dashboard
 FastAPI web dashboard for managing notifications.
 """
 
+import asyncio
+import hashlib
+import hmac
+import json
 import logging
 import os
-import secrets as stdlib_secrets
 import subprocess
+from contextlib import asynccontextmanager
 from pathlib import Path
 
 from fastapi import FastAPI, Depends, HTTPException, status, Request
 from fastapi.security import HTTPBasic, HTTPBasicCredentials
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse, FileResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, ORJSONResponse, Response
 
-from .models import HealthResponse
-from .routers import settings, state, test, secrets, restart, ntfy
+from .routers import settings, state, test, restart, ntfy
+from .routers import secrets as secrets_router
 
 # App configuration
 CONFIG_PATH = os.environ.get("CONFIG_PATH", "/app/config.yaml")
@@ -24,17 +28,85 @@ STATE_PATH = os.environ.get("STATE_PATH", "/app/state/state.json")
 DASHBOARD_TOKEN = os.environ.get("DASHBOARD_TOKEN", "")
 DASHBOARD_USER = os.environ.get("DASHBOARD_USER", "admin")
 
+# Pre-encoded once so the auth path only does the constant-time compares
+_DASHBOARD_USER_BYTES = DASHBOARD_USER.encode("utf8")
+_DASHBOARD_TOKEN_BYTES = DASHBOARD_TOKEN.encode("utf8")
+
 # Read version from VERSION file
 _version_file = Path(__file__).parent.parent / "VERSION"
 APP_VERSION = _version_file.read_text().strip() if _version_file.exists() else "1.0.0"
 
+TEMPLATE_PATH = Path(__file__).parent / "templates" / "index.html"
+
+# /health bodies never change for the life of the process, so encode them once
+_HEALTHY_BODY = json.dumps({"status": "healthy", "version": APP_VERSION}).encode()
+_UNHEALTHY_BODY = json.dumps(
+    {"status": "unhealthy", "version": APP_VERSION, "detail": "crond not running"}
+).encode()
+
+
+# Make paths available to routers and warm caches before serving traffic
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Initialize app state."""
+    from .crontab import ensure_config
+    ensure_config(CONFIG_PATH)
+    app.state.config_path = CONFIG_PATH
+    app.state.state_path = STATE_PATH
+    app.state.index_html = TEMPLATE_PATH.read_bytes() if TEMPLATE_PATH.exists() else b""
+    app.state.index_etag = f'"{hashlib.md5(app.state.index_html).hexdigest()}"'
+
+    # Prime the .env and config caches so the first request doesn't pay for parsing
+    log = logging.getLogger("dashboard")
+    try:
+        await asyncio.to_thread(secrets_router.load_env_file, secrets_router.ENV_PATH)
+    except Exception as e:
+        log.warning(f"Could not preload {secrets_router.ENV_PATH}: {e}")
+    try:
+        await asyncio.to_thread(secrets_router.load_config, CONFIG_PATH)
+    except Exception as e:
+        log.warning(f"Could not preload {CONFIG_PATH}: {e}")
+
+    if not DASHBOARD_TOKEN:
+        log.warning(
+            "DASHBOARD_TOKEN is not set — dashboard is running without authentication"
+        )
+
+    yield
+
+
 # Create FastAPI app
 app = FastAPI(
     title="Immich Memories Notify Dashboard",
     description="Web dashboard for managing Immich memory notifications",
     version=APP_VERSION,
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
 )
 
+# Global ceiling on in-flight requests; beyond it the dashboard answers 503
+# instead of queueing more file-lock / subprocess work. /health is exempt.
+MAX_IN_FLIGHT = int(os.environ.get("DASHBOARD_MAX_IN_FLIGHT", "64"))
+_in_flight = 0
+
+
+@app.middleware("http")
+async def limit_in_flight(request: Request, call_next):
+    """Shed load with 503 when too many requests are already being handled."""
+    global _in_flight
+    if _in_flight >= MAX_IN_FLIGHT and request.url.path != "/health":
+        return JSONResponse(
+            status_code=503,
+            content={"detail": "Server busy, try again shortly"},
+            headers={"Retry-After": "1"},
+        )
+    _in_flight += 1
+    try:
+        return await call_next(request)
+    finally:
+        _in_flight -= 1
+
+
 # Security - auto_error=False allows unauthenticated requests when no token is configured
 security = HTTPBasic(auto_error=False)
 
@@ -53,16 +125,17 @@ def verify_credentials(credentials: HTTPBasicCredentials = Depends(security)) ->
             headers={"WWW-Authenticate": "Basic"},
         )
 
-    is_username_correct = stdlib_secrets.compare_digest(
+    is_username_correct = hmac.compare_digest(
+        _DASHBOARD_USER_BYTES,
         credentials.username.encode("utf8"),
-        DASHBOARD_USER.encode("utf8"),
     )
-    is_password_correct = stdlib_secrets.compare_digest(
+    is_password_correct = hmac.compare_digest(
+        _DASHBOARD_TOKEN_BYTES,
         credentials.password.encode("utf8"),
-        DASHBOARD_TOKEN.encode("utf8"),
     )
 
-    if not (is_username_correct and is_password_correct):
+    # Bitwise & so both comparisons always run (no short-circuit timing leak)
+    if not (is_username_correct & is_password_correct):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials",
@@ -92,7 +165,7 @@ app.include_router(
     dependencies=[Depends(verify_credentials)],
 )
 app.include_router(
-    secrets.router,
+    secrets_router.router,
     prefix="/api/secrets",
     tags=["secrets"],
     dependencies=[Depends(verify_credentials)],
@@ -127,37 +200,35 @@ async def health_check():
             except (FileNotFoundError, PermissionError):
                 pass
     if not crond_ok:
-        return JSONResponse(
-            status_code=503,
-            content={"status": "unhealthy", "version": APP_VERSION, "detail": "crond not running"},
-        )
-    return HealthResponse(status="healthy", version=APP_VERSION)
+        return Response(content=_UNHEALTHY_BODY, status_code=503, media_type="application/json")
+    return Response(content=_HEALTHY_BODY, media_type="application/json")
 
 
 # Dashboard UI
 @app.get("/", response_class=HTMLResponse, tags=["ui"])
-async def dashboard_ui(username: str = Depends(verify_credentials)):
-    """Serve the dashboard HTML."""
-    template_path = Path(__file__).parent / "templates" / "index.html"
-    if template_path.exists():
-        return FileResponse(template_path, media_type="text/html")
-    return HTMLResponse(content="<h1>Dashboard</h1><p>Template not found</p>", status_code=500)
-
+async def dashboard_ui(request: Request, username: str = Depends(verify_credentials)):
+    """Serve the dashboard HTML (read once at startup, revalidated via ETag)."""
+    index_html = getattr(app.state, "index_html", b"")
+    if not index_html:
+        return HTMLResponse(content="<h1>Dashboard</h1><p>Template not found</p>", status_code=500)
 
-# Make paths available to routers
-@app.on_event("startup")
-async def startup_event():
-    """Initialize app state."""
-    from .crontab import ensure_config
-    ensure_config(CONFIG_PATH)
-    app.state.config_path = CONFIG_PATH
-    app.state.state_path = STATE_PATH
-    if not DASHBOARD_TOKEN:
-        logging.getLogger("dashboard").warning(
-            "DASHBOARD_TOKEN is not set — dashboard is running without authentication"
-        )
+    etag = app.state.index_etag
+    headers = {"ETag": etag, "Cache-Control": "private, max-age=60"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=index_html, media_type="text/html", headers=headers)
 
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=5000)
+    # uvloop/httptools come with uvicorn[standard]; workers > 1 needs the import string
+    uvicorn.run(
+        "dashboard.main:app",
+        host="0.0.0.0",
+        port=int(os.environ.get("DASHBOARD_PORT", "5000")),
+        loop="uvloop",
+        http="httptools",
+        timeout_keep_alive=30,
+        workers=int(os.environ.get("UVICORN_WORKERS", "1")),
+        limit_concurrency=int(os.environ.get("UVICORN_LIMIT_CONCURRENCY", "256")),
+    )
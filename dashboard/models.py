@@ -1,7 +1,10 @@
 """Pydantic models for the dashboard API."""
 
+import re
 from typing import List, Optional, Dict, Any
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+
+_HHMM_RE = re.compile(r"\d{2}:\d{2}")
 
 
 # Settings Models
@@ -11,11 +14,22 @@ class RetrySettings(BaseModel):
 
 
 class NotificationWindow(BaseModel):
-    start: str = Field(..., pattern=r"^\d{2}:\d{2}$", description="Start time (HH:MM)")
-    end: str = Field(..., pattern=r"^\d{2}:\d{2}$", description="End time (HH:MM)")
+    model_config = ConfigDict(frozen=True)  # shared via the settings response cache
+
+    start: str = Field(..., description="Start time (HH:MM)")
+    end: str = Field(..., description="End time (HH:MM)")
+
+    @field_validator("start", "end")
+    @classmethod
+    def _check_hhmm(cls, v: str) -> str:
+        if not _HHMM_RE.fullmatch(v):
+            raise ValueError("must be a time in HH:MM format")
+        return v
 
 
 class Settings(BaseModel):
+    model_config = ConfigDict(frozen=True)  # shared via the settings response cache
+
     retry: RetrySettings = Field(default_factory=RetrySettings)
     state_file: str = Field("state/state.json", max_length=256)
     log_level: str = Field("INFO", max_length=10)
@@ -50,6 +64,8 @@ class Settings(BaseModel):
 
 class UserInfo(BaseModel):
     """User info with sensitive fields redacted."""
+    model_config = ConfigDict(frozen=True)  # shared via the settings response cache
+
     name: str
     ntfy_topic: str
     enabled: bool = True
@@ -59,6 +75,8 @@ class UserInfo(BaseModel):
 
 class FullConfig(BaseModel):
     """Full configuration response."""
+    model_config = ConfigDict(frozen=True)  # shared via the settings response cache
+
     settings: Settings
     users: List[UserInfo]
     messages: List[str]
@@ -154,9 +172,3 @@ class TestTriggerResponse(BaseModel):
     success: bool
     message: str
     output: Optional[str] = None
-
-
-# Health Model
-class HealthResponse(BaseModel):
-    status: str
-    version: str
@@ -1,5 +1,6 @@
 """Scheduler reload and container restart endpoints."""
 
+import asyncio
 import os
 import time
 
@@ -27,7 +28,7 @@ def _delayed_exit():
 async def restart_scheduler():
     """Reload the scheduler crontab."""
     try:
-        reload_scheduler()
+        await asyncio.to_thread(reload_scheduler)
         return RestartResponse(success=True, message="Scheduler reloaded")
     except Exception as e:
         return RestartResponse(success=False, message=str(e))
@@ -37,7 +38,7 @@ async def restart_scheduler():
 async def restart_all(background_tasks: BackgroundTasks):
     """Reload scheduler and restart the container."""
     try:
-        reload_scheduler()
+        await asyncio.to_thread(reload_scheduler)
     except Exception:
         pass
     background_tasks.add_task(_delayed_exit)
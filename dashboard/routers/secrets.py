@@ -1,21 +1,25 @@
 """Secrets/Environment management API endpoints."""
 
+import hashlib
+import hmac
+import io
 import ipaddress
 import os
 import re
+import threading
 import time
 from pathlib import Path
 from typing import Optional, Dict, Any, List
 from urllib.parse import urlparse
 
 import requests as http_requests
-import yaml
 from fastapi import APIRouter, BackgroundTasks, HTTPException, Request
 from pydantic import BaseModel, Field
 
 from ..crontab import dump_env
 from ..utils.envfile import parse_env_line
-from ..utils.filelock import read_lock, write_lock
+from ..utils.filelock import exclusive_lock, read_lock
+from ..utils.yamlfile import load_yaml_file
 
 router = APIRouter()
 
@@ -23,6 +27,13 @@ router = APIRouter()
 ENV_PATH = os.environ.get("ENV_PATH", "/app/.env")
 CONFIG_PATH = os.environ.get("CONFIG_PATH", "/app/config.yaml")
 
+# Parsed .env contents keyed by path -> ((st_mtime_ns, st_size), env_vars)
+_env_cache: Dict[str, tuple] = {}
+_env_cache_lock = threading.Lock()
+
+# Matches a ${VAR_NAME} reference in config.yaml
+_ENV_REF_RE = re.compile(r'\$\{(\w+)\}')
+
 
 def _validate_url_not_internal(url: str):
     """Reject cloud-metadata / link-local URLs.
@@ -75,28 +86,58 @@ class UserSecretUpdate(BaseModel):
 
 
 def load_config(config_path: str) -> dict:
-    """Load configuration from YAML file."""
-    with read_lock(config_path):
-        with open(config_path) as f:
-            return yaml.safe_load(f) or {}
+    """Load configuration from YAML file (cached; treat the result as read-only)."""
+    return load_yaml_file(config_path)
 
 
-def load_env_file(env_path: str) -> dict:
-    """Load .env file into a dictionary."""
+def _parse_env_lines(lines) -> dict:
+    """Parse .env lines into a dictionary."""
     env_vars = {}
+    for line in lines:
+        parsed = parse_env_line(line)
+        if parsed:
+            env_vars[parsed[0]] = parsed[1]
+    return env_vars
+
+
+def _cache_env(env_path: str, st: os.stat_result, env_vars: dict):
+    """Remember parsed .env contents for the given file version."""
+    with _env_cache_lock:
+        _env_cache[env_path] = ((st.st_mtime_ns, st.st_size), env_vars)
+
+
+def _stat_or_none(path: str) -> Optional[os.stat_result]:
+    """stat() a path, returning None if it doesn't exist."""
+    try:
+        return os.stat(path)
+    except FileNotFoundError:
+        return None
+
+
+def load_env_file(env_path: str, st: Optional[os.stat_result] = None) -> dict:
+    """Load .env file into a dictionary.
+
+    Parsed results are cached until the file's mtime or size changes, so
+    repeated dashboard polls don't re-open and re-parse an unchanged file.
+    Callers that already stat'ed the file can pass the result to skip a syscall.
+    """
     path = Path(env_path)
+    if st is None:
+        st = _stat_or_none(env_path)
+    if st is None:
+        return {}
 
-    if not path.exists():
-        return env_vars
+    with _env_cache_lock:
+        cached = _env_cache.get(env_path)
+    if cached and cached[0] == (st.st_mtime_ns, st.st_size):
+        return dict(cached[1])
 
     with read_lock(env_path):
         with open(path) as f:
-            for line in f:
-                parsed = parse_env_line(line)
-                if parsed:
-                    env_vars[parsed[0]] = parsed[1]
+            env_vars = _parse_env_lines(f.read().splitlines())
 
-    return env_vars
+    _cache_env(env_path, st, env_vars)
+    return dict(env_vars)
 
 
 def _sanitize_env_value(value: str) -> str:
@@ -108,38 +149,52 @@ def _sanitize_env_value(value: str) -> str:
 
 
 def save_env_file(env_path: str, env_vars: dict):
-    """Save dictionary to .env file, preserving comments and order."""
+    """Save dictionary to .env file, preserving comments and order.
+
+    The existing file is read and rewritten under a single exclusive lock, so
+    passing only the changed keys merges safely with concurrent writers.
+    It is rewritten in place rather than replaced via rename because .env is
+    a single-file bind mount in docker-compose, where rename fails (EBUSY).
+    """
     path = Path(env_path)
-    lines = []
     updated_keys = set()
 
     # Sanitize all values
     sanitized = {k: _sanitize_env_value(str(v)) for k, v in env_vars.items()}
 
-    # Read existing file to preserve structure
-    if path.exists():
-        with read_lock(env_path):
+    buf = io.StringIO()
+    with exclusive_lock(env_path):
+        # Read existing file to preserve structure
+        try:
             with open(path) as f:
-                for line in f:
-                    stripped = line.strip()
-                    if stripped and not stripped.startswith('#') and '=' in stripped:
-                        key = stripped.split('=')[0].strip()
-                        if key in sanitized:
-                            lines.append(f'{key}={sanitized[key]}\n')
-                            updated_keys.add(key)
-                        else:
-                            lines.append(line)
-                    else:
-                        lines.append(line)
-
-    # Add any new keys not in original file
-    for key, value in sanitized.items():
-        if key not in updated_keys:
-            lines.append(f'{key}={value}\n')
-
-    with write_lock(env_path):
+                original_lines = f.readlines()
+        except FileNotFoundError:
+            original_lines = []
+
+        for line in original_lines:
+            stripped = line.strip()
+            if stripped and not stripped.startswith('#') and '=' in stripped:
+                key = stripped.split('=')[0].strip()
+                if key in sanitized:
+                    buf.write(f'{key}={sanitized[key]}\n')
+                    updated_keys.add(key)
+                    continue
+            buf.write(line)
+
+        # Add any new keys not in original file
+        for key, value in sanitized.items():
+            if key not in updated_keys:
+                buf.write(f'{key}={value}\n')
+
+        content = buf.getvalue()
         with open(path, 'w') as f:
-            f.writelines(lines)
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        st = path.stat()
+
+    # Refresh the cache from what we just wrote so the next read is a hit
+    _cache_env(env_path, st, _parse_env_lines(content.splitlines()))
 
 
 def mask_secret(value: str) -> str:
@@ -151,27 +206,17 @@ def mask_secret(value: str) -> str:
     return "********" + value[-4:]
 
 
-def get_env_var_name(user_name: str, var_type: str) -> str:
-    """Get environment variable name for a user.
+def _user_env_var_name(user: Optional[dict], user_name: str, var_type: str) -> str:
+    """Resolve the env var a config user record points at.
 
-    Looks at config.yaml to find what variable the user is configured to use,
-    then extracts the variable name from ${VAR_NAME} format.
+    Extracts VAR_NAME from the record's ${VAR_NAME} reference, falling back to
+    the standard naming when there is no record or no reference.
     """
-    try:
-        config = load_config(CONFIG_PATH)
-        users = config.get("users", [])
-        for user in users:
-            if user.get("name") == user_name:
-                if var_type == "api_key":
-                    ref = user.get("immich_api_key", "")
-                else:  # ntfy_password
-                    ref = user.get("ntfy_password", "")
-                # Extract var name from ${VAR_NAME}
-                match = re.match(r'\$\{(\w+)\}', ref)
-                if match:
-                    return match.group(1)
-    except Exception:
-        pass
+    if user:
+        ref = user.get("immich_api_key" if var_type == "api_key" else "ntfy_password", "")
+        match = _ENV_REF_RE.match(ref) if isinstance(ref, str) else None
+        if match:
+            return match.group(1)
 
     # Fallback to standard naming
     safe_name = user_name.upper().replace(" ", "_")
@@ -180,6 +225,31 @@ def get_env_var_name(user_name: str, var_type: str) -> str:
     return f"NTFY_PASSWORD_{safe_name}"
 
 
+def get_env_var_name(user_name: str, var_type: str, config: Optional[dict] = None) -> str:
+    """Get environment variable name for a user.
+
+    Looks at config.yaml to find what variable the user is configured to use,
+    then extracts the variable name from ${VAR_NAME} format. Pass an already
+    loaded config to avoid re-reading it for every user.
+    """
+    user = None
+    try:
+        if config is None:
+            config = load_config(CONFIG_PATH)
+        user = next((u for u in config.get("users", []) if u.get("name") == user_name), None)
+    except Exception:
+        pass
+    return _user_env_var_name(user, user_name, var_type)
+
+
+def _load_config_or_empty() -> dict:
+    """Load config.yaml once per request, tolerating a missing/broken file."""
+    try:
+        return load_config(CONFIG_PATH)
+    except Exception:
+        return {}
+
+
 @router.get("/urls")
 async def get_server_urls():
     """Get server URLs (from environment)."""
@@ -194,24 +264,22 @@ async def get_server_urls():
 @router.get("/")
 async def get_secrets_masked(request: Request):
     """Get all secrets with sensitive values masked, based on users in config."""
-    env_vars = load_env_file(ENV_PATH)
+    env_st = _stat_or_none(ENV_PATH)
+    env_vars = load_env_file(ENV_PATH, env_st)
 
     # Load users from config
-    try:
-        config = load_config(CONFIG_PATH)
-        config_users = config.get("users", [])
-    except Exception:
-        config_users = []
+    config = _load_config_or_empty()
+    config_users = config.get("users", [])
 
-    # Build dynamic user secrets
+    # Build dynamic user secrets in a single pass over the user records
     users_secrets = {}
     for user in config_users:
         user_name = user.get("name", "")
-        if not user_name:
+        if not user_name or user_name in users_secrets:
             continue
 
-        api_key_var = get_env_var_name(user_name, "api_key")
-        password_var = get_env_var_name(user_name, "ntfy_password")
+        api_key_var = _user_env_var_name(user, user_name, "api_key")
+        password_var = _user_env_var_name(user, user_name, "ntfy_password")
 
         api_key_value = env_vars.get(api_key_var, "")
         password_value = env_vars.get(password_var, "")
@@ -236,50 +304,67 @@ async def get_secrets_masked(request: Request):
             "token_set": bool(env_vars.get("DASHBOARD_TOKEN") or os.environ.get("DASHBOARD_TOKEN")),
         },
         "users": users_secrets,
-        "env_file_exists": Path(ENV_PATH).exists(),
+        "env_file_exists": env_st is not None,
         "restart_required_note": "Changes to secrets require container restart to take effect",
     }
 
 
+def _secret_equals(a: str, b: str) -> bool:
+    """Constant-time string comparison (digests first so lengths don't leak)."""
+    return hmac.compare_digest(
+        hashlib.sha256(a.encode("utf8")).digest(),
+        hashlib.sha256(b.encode("utf8")).digest(),
+    )
+
+
+def _set_if_changed(env_vars: dict, key: str, value: str, updated: list, sensitive: bool = False):
+    """Set env_vars[key] and record it in updated, unless the value is unchanged.
+
+    Sensitive values (token, API keys, passwords) are compared in constant time.
+    """
+    current = env_vars.get(key)
+    if sensitive:
+        if current is not None and _secret_equals(current, value):
+            return
+    elif current == value:
+        return
+    env_vars[key] = value
+    updated.append(key)
+
+
 @router.put("/")
-async def update_secrets(update: SecretsUpdate, background_tasks: BackgroundTasks):
-    """Update secrets in .env file. Only non-empty values are updated."""
+def update_secrets(update: SecretsUpdate, background_tasks: BackgroundTasks):
+    """Update secrets in .env file. Only non-empty, changed values are written."""
     env_vars = load_env_file(ENV_PATH)
     updated = []
 
     # Server URLs
-    if update.immich_url is not None and update.immich_url:
-        env_vars["IMMICH_URL"] = update.immich_url
-        updated.append("IMMICH_URL")
-    if update.immich_external_url is not None and update.immich_external_url:
-        env_vars["IMMICH_EXTERNAL_URL"] = update.immich_external_url
-        updated.append("IMMICH_EXTERNAL_URL")
-    if update.ntfy_url is not None and update.ntfy_url:
-        env_vars["NTFY_URL"] = update.ntfy_url
-        updated.append("NTFY_URL")
-    if update.ntfy_external_url is not None and update.ntfy_external_url:
-        env_vars["NTFY_EXTERNAL_URL"] = update.ntfy_external_url
-        updated.append("NTFY_EXTERNAL_URL")
+    if update.immich_url:
+        _set_if_changed(env_vars, "IMMICH_URL", update.immich_url, updated)
+    if update.immich_external_url:
+        _set_if_changed(env_vars, "IMMICH_EXTERNAL_URL", update.immich_external_url, updated)
+    if update.ntfy_url:
+        _set_if_changed(env_vars, "NTFY_URL", update.ntfy_url, updated)
+    if update.ntfy_external_url:
+        _set_if_changed(env_vars, "NTFY_EXTERNAL_URL", update.ntfy_external_url, updated)
 
     # Dashboard token
-    if update.dashboard_token is not None and update.dashboard_token:
-        env_vars["DASHBOARD_TOKEN"] = update.dashboard_token
-        updated.append("DASHBOARD_TOKEN")
+    if update.dashboard_token:
+        _set_if_changed(env_vars, "DASHBOARD_TOKEN", update.dashboard_token, updated, sensitive=True)
 
     # Dynamic user secrets
     if update.users:
+        config = _load_config_or_empty()
         for user_name, secrets in update.users.items():
             if secrets.get("api_key"):
-                var_name = get_env_var_name(user_name, "api_key")
-                env_vars[var_name] = secrets["api_key"]
-                updated.append(var_name)
+                var_name = get_env_var_name(user_name, "api_key", config)
+                _set_if_changed(env_vars, var_name, secrets["api_key"], updated, sensitive=True)
             if secrets.get("ntfy_password"):
-                var_name = get_env_var_name(user_name, "ntfy_password")
-                env_vars[var_name] = secrets["ntfy_password"]
-                updated.append(var_name)
+                var_name = get_env_var_name(user_name, "ntfy_password", config)
+                _set_if_changed(env_vars, var_name, secrets["ntfy_password"], updated, sensitive=True)
 
     if updated:
-        save_env_file(ENV_PATH, env_vars)
+        save_env_file(ENV_PATH, {key: env_vars[key] for key in updated})
         background_tasks.add_task(dump_env)
 
     return {
@@ -291,23 +376,22 @@ async def update_secrets(update: SecretsUpdate, background_tasks: BackgroundTask
 
 
 @router.put("/user/{user_name}")
-async def update_user_secrets(user_name: str, update: UserSecretUpdate, background_tasks: BackgroundTasks):
+def update_user_secrets(user_name: str, update: UserSecretUpdate, background_tasks: BackgroundTasks):
     """Update a single user's secrets."""
     env_vars = load_env_file(ENV_PATH)
+    config = _load_config_or_empty()
     updated = []
 
     if update.api_key:
-        var_name = get_env_var_name(user_name, "api_key")
-        env_vars[var_name] = update.api_key
-        updated.append(var_name)
+        var_name = get_env_var_name(user_name, "api_key", config)
+        _set_if_changed(env_vars, var_name, update.api_key, updated, sensitive=True)
 
     if update.ntfy_password:
-        var_name = get_env_var_name(user_name, "ntfy_password")
-        env_vars[var_name] = update.ntfy_password
-        updated.append(var_name)
+        var_name = get_env_var_name(user_name, "ntfy_password", config)
+        _set_if_changed(env_vars, var_name, update.ntfy_password, updated, sensitive=True)
 
     if updated:
-        save_env_file(ENV_PATH, env_vars)
+        save_env_file(ENV_PATH, {key: env_vars[key] for key in updated})
         background_tasks.add_task(dump_env)
 
     return {
@@ -326,11 +410,11 @@ async def get_setup_complete():
 
 
 @router.post("/setup-complete")
-async def mark_setup_complete():
+def mark_setup_complete():
     """Mark the setup wizard as completed (sets SETUP_COMPLETE=true in .env)."""
     env_vars = load_env_file(ENV_PATH)
-    env_vars["SETUP_COMPLETE"] = "true"
-    save_env_file(ENV_PATH, env_vars)
+    if env_vars.get("SETUP_COMPLETE") != "true":
+        save_env_file(ENV_PATH, {"SETUP_COMPLETE": "true"})
     return {"setup_complete": True}
 
 
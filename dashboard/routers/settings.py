@@ -2,13 +2,12 @@
 
 import json
 import os
-import re
 from pathlib import Path
-from typing import List
+from typing import List, Optional
 
 import requests as http_requests
 import yaml
-from fastapi import APIRouter, BackgroundTasks, HTTPException, Request
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Request, Response
 from pydantic import BaseModel, Field
 
 from ..models import (
@@ -21,11 +20,40 @@ from ..models import (
     MessagesUpdate,
     UserEnabledUpdate,
 )
-from ..utils.filelock import exclusive_lock, read_lock, write_lock
+from ..utils.etag import check_not_modified, file_etag
+from ..utils.filelock import exclusive_lock, write_lock
+from ..utils.yamlfile import (
+    dump_yaml,
+    invalidate_yaml_file,
+    load_yaml,
+    load_yaml_file,
+    write_yaml_snapshot,
+    YamlLoader,
+)
 from ..crontab import reload_scheduler
 
 router = APIRouter()
 
+# Top-level config keys holding message/title template lists
+MESSAGE_KEYS = (
+    "messages",
+    "person_messages",
+    "video_messages",
+    "video_person_messages",
+    "then_and_now_messages",
+    "trip_highlights_messages",
+    "album_messages",
+    "video_album_messages",
+    "memory_titles",
+    "person_titles",
+    "collage_titles",
+    "then_and_now_titles",
+    "trip_highlights_titles",
+    "album_titles",
+    "birthday_messages",
+    "birthday_titles",
+)
+
 
 def get_config_path(request: Request) -> str:
     """Get config path from app state."""
@@ -33,20 +61,29 @@ def get_config_path(request: Request) -> str:
 
 
 def load_config(config_path: str) -> dict:
-    """Load configuration from YAML file (shared lock)."""
+    """Load configuration from YAML file (shared lock).
+
+    Cached until the file's mtime or size changes; treat the result as read-only.
+    """
     if not Path(config_path).is_file():
         return {"immich": {}, "ntfy": {}, "users": [], "settings": {}}
-    with read_lock(config_path):
-        with open(config_path) as f:
-            return yaml.safe_load(f) or {}
+    return load_yaml_file(config_path)
 
 
 def save_config(config_path: str, config: dict):
-    """Save configuration to YAML file (exclusive lock)."""
+    """Save configuration to YAML file (exclusive lock).
+
+    The document is serialized before the lock is taken so readers only wait
+    for the write itself. config.yaml is a single-file bind mount, so it is
+    rewritten in place rather than replaced via rename.
+    """
+    text = dump_yaml(config)
     Path(config_path).parent.mkdir(parents=True, exist_ok=True)
     with write_lock(config_path):
         with open(config_path, 'w') as f:
-            yaml.dump(config, f, default_flow_style=False, allow_unicode=True, sort_keys=False)
+            f.write(text)
+    invalidate_yaml_file(config_path)
+    write_yaml_snapshot(config_path, config)
 
 
 def load_config_exclusive(config_path: str) -> tuple:
@@ -61,29 +98,160 @@ def load_config_exclusive(config_path: str) -> tuple:
     if not Path(config_path).is_file():
         return {"immich": {}, "ntfy": {}, "users": [], "settings": {}}
     with open(config_path) as f:
-        return yaml.safe_load(f) or {}
+        return load_yaml(f) or {}
 
 
 def _write_yaml(config_path: str, config: dict):
     """Write config without acquiring a new lock (caller holds exclusive_lock)."""
+    _write_text(config_path, dump_yaml(config))
+    write_yaml_snapshot(config_path, config)
+
+
+def _write_text(config_path: str, text: str):
+    """Write raw config text in place (caller holds exclusive_lock)."""
     with open(config_path, 'w') as f:
-        yaml.dump(config, f, default_flow_style=False, allow_unicode=True, sort_keys=False)
+        f.write(text)
         f.flush()
         os.fsync(f.fileno())
+    invalidate_yaml_file(config_path)
 
 
-@router.get("/", response_model=FullConfig)
-async def get_settings(request: Request):
-    """Get full configuration (with sensitive fields redacted)."""
-    config_path = get_config_path(request)
+_YAML_STR_TAG = "tag:yaml.org,2002:str"
+_YAML_BOOL_TAG = "tag:yaml.org,2002:bool"
+
+
+def _node_refcounts(root) -> dict:
+    """Count how often each node is referenced in a composed document.
+
+    The composer returns the anchored node itself for every *alias, so a
+    count above 1 means the node is shared through an anchor.
+    """
+    counts = {}
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        counts[id(node)] = counts.get(id(node), 0) + 1
+        if counts[id(node)] > 1:
+            continue
+        if isinstance(node, yaml.MappingNode):
+            for k, v in node.value:
+                stack.extend((k, v))
+        elif isinstance(node, yaml.SequenceNode):
+            stack.extend(node.value)
+    return counts
+
+
+def _patch_user_enabled(text: str, name: str, enabled: bool) -> Optional[str]:
+    """Flip users[name].enabled directly in the YAML text.
+
+    Composes the document (no construction or re-emit) to find the scalar's
+    position and splices in the new value, leaving the rest of the file
+    byte-for-byte untouched. Duplicate keys resolve like the loader does (the
+    last one wins). Returns None when the shape isn't the simple case (user
+    or key missing, multi-line or aliased value), so the caller can fall back
+    to a full rewrite.
+    """
+    root = yaml.compose(text, Loader=YamlLoader)
+    if not isinstance(root, yaml.MappingNode):
+        return None
+    top = {k.value: v for k, v in root.value if isinstance(k, yaml.ScalarNode)}
+    users = top.get("users")
+    if not isinstance(users, yaml.SequenceNode):
+        return None
+    for item in users.value:
+        if not isinstance(item, yaml.MappingNode):
+            continue
+        fields = {k.value: v for k, v in item.value if isinstance(k, yaml.ScalarNode)}
+        user_name = fields.get("name")
+        if not isinstance(user_name, yaml.ScalarNode) or user_name.tag != _YAML_STR_TAG:
+            continue
+        if user_name.value != name:
+            continue
+        node = fields.get("enabled")
+        if not isinstance(node, yaml.ScalarNode) or node.tag != _YAML_BOOL_TAG:
+            return None
+        # A value shared via an anchor would flip every user that aliases it
+        if _node_refcounts(root).get(id(node), 0) > 1:
+            return None
+        start, end = node.start_mark, node.end_mark
+        if start.line != end.line:
+            return None
+        lines = text.split("\n")
+        line = lines[start.line]
+        lines[start.line] = line[:start.column] + ("true" if enabled else "false") + line[end.column:]
+        return "\n".join(lines)
+    return None
+
+
+# Response models built from the most recently served config dict. load_config()
+# returns the same (read-only) dict until config.yaml changes, so an identity
+# check is enough to know the cached models are still current.
+_view_cache: tuple = (None, {})
+
+
+def _cached_view(config: dict, name: str, build):
+    """Return build(config), memoized for as long as config is the cached dict."""
+    global _view_cache
+    owner, views = _view_cache
+    if owner is not config:
+        views = {}
+        _view_cache = (config, views)
+    view = views.get(name)
+    if view is None:
+        view = views[name] = build(config)
+    return view
+
+
+def _build_user_infos(config: dict) -> List[UserInfo]:
+    """Build redacted UserInfo models for every configured user."""
+    return [
+        UserInfo(
+            name=u.get("name", ""),
+            ntfy_topic=u.get("ntfy_topic", ""),
+            enabled=u.get("enabled", True),
+            home_cities=u.get("home_cities") or ([u["home_city"]] if u.get("home_city") else []),
+            album_names=u.get("album_names", []),
+        )
+        for u in config.get("users", [])
+    ]
+
+
+def _index_users(users: list) -> dict:
+    """Map user name -> position in users (first entry wins on duplicates)."""
+    index = {}
+    for i, u in enumerate(users):
+        index.setdefault(u.get("name"), i)
+    return index
+
+
+def _find_user(users: list, name: str) -> Optional[dict]:
+    """Return the first user entry called name, or None (single lookup on a fresh parse)."""
+    return next((u for u in users if u.get("name") == name), None)
+
+
+def _build_users_by_name(config: dict) -> dict:
+    return _index_users(config.get("users", []))
+
+
+def _lookup_user(config: dict, name: str) -> Optional[dict]:
+    """O(1) user lookup in a cached (read-only) config via its memoized index."""
+    idx = _cached_view(config, "users_by_name", _build_users_by_name).get(name)
+    return None if idx is None else config["users"][idx]
+
+
+def _build_windows(config: dict) -> List[NotificationWindow]:
+    """Build NotificationWindow models from settings.notification_windows."""
+    windows = config.get("settings", {}).get("notification_windows", [])
+    return [NotificationWindow(**w) for w in windows]
 
-    try:
-        config = load_config(config_path)
-    except FileNotFoundError:
-        raise HTTPException(status_code=404, detail="Config file not found")
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error reading config: {str(e)}")
 
+def _build_messages(config: dict) -> dict:
+    """Collect all message/title template lists."""
+    return {key: config.get(key, []) for key in MESSAGE_KEYS}
+
+
+def _build_full_config(config: dict) -> FullConfig:
+    """Build the FullConfig response model (sensitive fields redacted)."""
     # Build settings
     settings_data = config.get("settings", {})
     settings = Settings(
@@ -100,9 +268,7 @@ async def get_settings(request: Request):
         video_emoji=settings_data.get("video_emoji", True),
         prefer_group_photos=settings_data.get("prefer_group_photos", True),
         min_group_size=settings_data.get("min_group_size", 2),
-        notification_windows=[
-            NotificationWindow(**w) for w in settings_data.get("notification_windows", [])
-        ],
+        notification_windows=_cached_view(config, "windows", _build_windows),
         weekly_collage_enabled=settings_data.get("weekly_collage_enabled", False),
         weekly_collage_day=settings_data.get("weekly_collage_day", 6),
         weekly_collage_slots=settings_data.get("weekly_collage_slots", 1),
@@ -123,55 +289,51 @@ async def get_settings(request: Request):
     )
 
     # Redact sensitive user info
-    users = [
-        UserInfo(
-            name=u.get("name", ""),
-            ntfy_topic=u.get("ntfy_topic", ""),
-            enabled=u.get("enabled", True),
-            home_cities=u.get("home_cities") or ([u["home_city"]] if u.get("home_city") else []),
-            album_names=u.get("album_names", []),
-        )
-        for u in config.get("users", [])
-    ]
+    users = _cached_view(config, "users", _build_user_infos)
 
     return FullConfig(
         settings=settings,
         users=users,
-        messages=config.get("messages", []),
-        person_messages=config.get("person_messages", []),
-        video_messages=config.get("video_messages", []),
-        video_person_messages=config.get("video_person_messages", []),
-        then_and_now_messages=config.get("then_and_now_messages", []),
-        trip_highlights_messages=config.get("trip_highlights_messages", []),
-        album_messages=config.get("album_messages", []),
-        video_album_messages=config.get("video_album_messages", []),
-        memory_titles=config.get("memory_titles", []),
-        person_titles=config.get("person_titles", []),
-        collage_titles=config.get("collage_titles", []),
-        then_and_now_titles=config.get("then_and_now_titles", []),
-        trip_highlights_titles=config.get("trip_highlights_titles", []),
-        album_titles=config.get("album_titles", []),
-        birthday_messages=config.get("birthday_messages", []),
-        birthday_titles=config.get("birthday_titles", []),
+        **_cached_view(config, "messages", _build_messages),
     )
 
 
+@router.get("/", response_model=FullConfig)
+def get_settings(request: Request, response: Response):
+    """Get full configuration (with sensitive fields redacted)."""
+    config_path = get_config_path(request)
+    not_modified = check_not_modified(request, response, file_etag(config_path))
+    if not_modified:
+        return not_modified
+
+    try:
+        config = load_config(config_path)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Config file not found")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error reading config: {str(e)}")
+
+    return _cached_view(config, "full", _build_full_config)
+
+
 @router.get("/windows", response_model=List[NotificationWindow])
-async def get_windows(request: Request):
+def get_windows(request: Request, response: Response):
     """Get notification windows."""
     config_path = get_config_path(request)
+    not_modified = check_not_modified(request, response, file_etag(config_path))
+    if not_modified:
+        return not_modified
 
     try:
         config = load_config(config_path)
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail="Config file not found")
 
-    windows = config.get("settings", {}).get("notification_windows", [])
-    return [NotificationWindow(**w) for w in windows]
+    return _cached_view(config, "windows", _build_windows)
 
 
 @router.put("/windows")
-async def update_windows(request: Request, update: WindowsUpdate, background_tasks: BackgroundTasks):
+def update_windows(request: Request, update: WindowsUpdate, background_tasks: BackgroundTasks):
     """Update notification windows."""
     config_path = get_config_path(request)
 
@@ -193,37 +355,23 @@ async def update_windows(request: Request, update: WindowsUpdate, background_tas
 
 
 @router.get("/messages")
-async def get_messages(request: Request):
+def get_messages(request: Request, response: Response):
     """Get all message templates."""
     config_path = get_config_path(request)
+    not_modified = check_not_modified(request, response, file_etag(config_path))
+    if not_modified:
+        return not_modified
 
     try:
         config = load_config(config_path)
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail="Config file not found")
 
-    return {
-        "messages": config.get("messages", []),
-        "person_messages": config.get("person_messages", []),
-        "video_messages": config.get("video_messages", []),
-        "video_person_messages": config.get("video_person_messages", []),
-        "then_and_now_messages": config.get("then_and_now_messages", []),
-        "trip_highlights_messages": config.get("trip_highlights_messages", []),
-        "album_messages": config.get("album_messages", []),
-        "video_album_messages": config.get("video_album_messages", []),
-        "memory_titles": config.get("memory_titles", []),
-        "person_titles": config.get("person_titles", []),
-        "collage_titles": config.get("collage_titles", []),
-        "then_and_now_titles": config.get("then_and_now_titles", []),
-        "trip_highlights_titles": config.get("trip_highlights_titles", []),
-        "album_titles": config.get("album_titles", []),
-        "birthday_messages": config.get("birthday_messages", []),
-        "birthday_titles": config.get("birthday_titles", []),
-    }
+    return _cached_view(config, "messages", _build_messages)
 
 
 @router.put("/messages")
-async def update_messages(request: Request, update: MessagesUpdate):
+def update_messages(request: Request, update: MessagesUpdate):
     """Update message templates."""
     config_path = get_config_path(request)
 
@@ -270,7 +418,7 @@ async def update_messages(request: Request, update: MessagesUpdate):
 
 
 @router.put("/")
-async def update_settings(request: Request, update: SettingsUpdate):
+def update_settings(request: Request, update: SettingsUpdate):
     """Update general settings."""
     config_path = get_config_path(request)
     update_dict = update.model_dump(exclude_none=True)
@@ -290,45 +438,43 @@ async def update_settings(request: Request, update: SettingsUpdate):
 
 
 @router.get("/users", response_model=List[UserInfo])
-async def get_users(request: Request):
+def get_users(request: Request, response: Response):
     """Get users (with sensitive fields redacted)."""
     config_path = get_config_path(request)
+    not_modified = check_not_modified(request, response, file_etag(config_path))
+    if not_modified:
+        return not_modified
 
     try:
         config = load_config(config_path)
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail="Config file not found")
 
-    return [
-        UserInfo(
-            name=u.get("name", ""),
-            ntfy_topic=u.get("ntfy_topic", ""),
-            enabled=u.get("enabled", True),
-            home_cities=u.get("home_cities") or ([u["home_city"]] if u.get("home_city") else []),
-            album_names=u.get("album_names", []),
-        )
-        for u in config.get("users", [])
-    ]
+    return _cached_view(config, "users", _build_user_infos)
 
 
 @router.put("/users/{name}/enabled")
-async def toggle_user(request: Request, name: str, update: UserEnabledUpdate):
+def toggle_user(request: Request, name: str, update: UserEnabledUpdate):
     """Toggle user enabled status."""
     config_path = get_config_path(request)
 
     try:
         with exclusive_lock(config_path):
-            config = load_config_exclusive(config_path)
-            users = config.get("users", [])
-            user_found = False
-            for user in users:
-                if user.get("name") == name:
-                    user["enabled"] = update.enabled
-                    user_found = True
-                    break
-            if not user_found:
-                raise HTTPException(status_code=404, detail=f"User '{name}' not found")
-            _write_yaml(config_path, config)
+            # Fast path: patch the one scalar in place instead of re-emitting
+            # the whole file (also keeps hand-written comments intact).
+            with open(config_path) as f:
+                text = f.read()
+            patched = _patch_user_enabled(text, name, update.enabled)
+            if patched is not None:
+                _write_text(config_path, patched)
+            else:
+                config = load_yaml(text) or {}
+                users = config.get("users", [])
+                user = _find_user(users, name)
+                if user is None:
+                    raise HTTPException(status_code=404, detail=f"User '{name}' not found")
+                user["enabled"] = update.enabled
+                _write_yaml(config_path, config)
     except HTTPException:
         raise
     except FileNotFoundError:
@@ -349,7 +495,7 @@ class RenameUser(BaseModel):
 
 
 @router.post("/users")
-async def add_user(request: Request, user: NewUser):
+def add_user(request: Request, user: NewUser):
     """Add a new user."""
     config_path = get_config_path(request)
 
@@ -358,9 +504,8 @@ async def add_user(request: Request, user: NewUser):
             config = load_config_exclusive(config_path)
             users = config.get("users", [])
 
-            for u in users:
-                if u.get("name") == user.name:
-                    raise HTTPException(status_code=400, detail=f"User '{user.name}' already exists")
+            if _find_user(users, user.name) is not None:
+                raise HTTPException(status_code=400, detail=f"User '{user.name}' already exists")
 
             new_user = {
                 "name": user.name,
@@ -390,7 +535,7 @@ async def add_user(request: Request, user: NewUser):
 
 
 @router.delete("/users/{name}")
-async def delete_user(request: Request, name: str):
+def delete_user(request: Request, name: str):
     """Delete a user."""
     config_path = get_config_path(request)
 
@@ -413,7 +558,7 @@ async def delete_user(request: Request, name: str):
 
 
 @router.put("/users/{name}/home_cities")
-async def set_user_home_cities(request: Request, name: str, body: dict):
+def set_user_home_cities(request: Request, name: str, body: dict):
     """Set home cities for a user (excluded from Trip Highlights)."""
     config_path = get_config_path(request)
 
@@ -421,15 +566,11 @@ async def set_user_home_cities(request: Request, name: str, body: dict):
         with exclusive_lock(config_path):
             config = load_config_exclusive(config_path)
             users = config.get("users", [])
-            user_found = False
-            for user in users:
-                if user.get("name") == name:
-                    user["home_cities"] = body.get("home_cities", [])
-                    user.pop("home_city", None)
-                    user_found = True
-                    break
-            if not user_found:
+            user = _find_user(users, name)
+            if user is None:
                 raise HTTPException(status_code=404, detail=f"User '{name}' not found")
+            user["home_cities"] = body.get("home_cities", [])
+            user.pop("home_city", None)
             _write_yaml(config_path, config)
     except HTTPException:
         raise
@@ -441,9 +582,9 @@ async def set_user_home_cities(request: Request, name: str, body: dict):
 
 def _resolve_user_api_key(user: dict) -> str:
     """Resolve a user's Immich API key from env var reference."""
-    from .secrets import load_env_file, ENV_PATH
+    from .secrets import _ENV_REF_RE, load_env_file, ENV_PATH
     ref = user.get("immich_api_key", "")
-    match = re.match(r'\$\{(\w+)\}', ref)
+    match = _ENV_REF_RE.match(ref)
     if match:
         env_vars = load_env_file(ENV_PATH)
         return env_vars.get(match.group(1), "")
@@ -451,7 +592,7 @@ def _resolve_user_api_key(user: dict) -> str:
 
 
 @router.get("/users/{name}/cities")
-async def get_user_cities(request: Request, name: str):
+def get_user_cities(request: Request, name: str):
     """Fetch unique cities from a user's photos in Immich."""
     config_path = get_config_path(request)
 
@@ -460,7 +601,7 @@ async def get_user_cities(request: Request, name: str):
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail="Config file not found")
 
-    user = next((u for u in config.get("users", []) if u.get("name") == name), None)
+    user = _lookup_user(config, name)
     if not user:
         raise HTTPException(status_code=404, detail=f"User '{name}' not found")
 
@@ -493,7 +634,7 @@ async def get_user_cities(request: Request, name: str):
 
 
 @router.get("/users/{name}/albums")
-async def get_user_albums(request: Request, name: str):
+def get_user_albums(request: Request, name: str):
     """Fetch albums from Immich for a user."""
     config_path = get_config_path(request)
 
@@ -502,7 +643,7 @@ async def get_user_albums(request: Request, name: str):
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail="Config file not found")
 
-    user = next((u for u in config.get("users", []) if u.get("name") == name), None)
+    user = _lookup_user(config, name)
     if not user:
         raise HTTPException(status_code=404, detail=f"User '{name}' not found")
 
@@ -531,7 +672,7 @@ async def get_user_albums(request: Request, name: str):
 
 
 @router.put("/users/{name}/album_names")
-async def set_user_album_names(request: Request, name: str, body: dict):
+def set_user_album_names(request: Request, name: str, body: dict):
     """Set the album names for a user (used for album notifications)."""
     config_path = get_config_path(request)
 
@@ -539,14 +680,10 @@ async def set_user_album_names(request: Request, name: str, body: dict):
         with exclusive_lock(config_path):
             config = load_config_exclusive(config_path)
             users = config.get("users", [])
-            user_found = False
-            for user in users:
-                if user.get("name") == name:
-                    user["album_names"] = body.get("album_names", [])
-                    user_found = True
-                    break
-            if not user_found:
+            user = _find_user(users, name)
+            if user is None:
                 raise HTTPException(status_code=404, detail=f"User '{name}' not found")
+            user["album_names"] = body.get("album_names", [])
             _write_yaml(config_path, config)
     except HTTPException:
         raise
@@ -557,7 +694,7 @@ async def set_user_album_names(request: Request, name: str, body: dict):
 
 
 @router.put("/users/{name}/rename")
-async def rename_user(request: Request, name: str, update: RenameUser):
+def rename_user(request: Request, name: str, update: RenameUser):
     """Rename a user."""
     config_path = get_config_path(request)
 
@@ -566,19 +703,14 @@ async def rename_user(request: Request, name: str, update: RenameUser):
             config = load_config_exclusive(config_path)
             users = config.get("users", [])
 
-            for u in users:
-                if u.get("name") == update.new_name:
-                    raise HTTPException(status_code=400, detail=f"User '{update.new_name}' already exists")
-
-            user_found = False
-            for u in users:
-                if u.get("name") == name:
-                    u["name"] = update.new_name
-                    user_found = True
-                    break
+            users_by_name = _index_users(users)
+            if update.new_name in users_by_name:
+                raise HTTPException(status_code=400, detail=f"User '{update.new_name}' already exists")
 
-            if not user_found:
+            idx = users_by_name.get(name)
+            if idx is None:
                 raise HTTPException(status_code=404, detail=f"User '{name}' not found")
+            users[idx]["name"] = update.new_name
             _write_yaml(config_path, config)
     except HTTPException:
         raise
@@ -1,13 +1,16 @@
 """State management API endpoints."""
 
 import json
+import os
 from datetime import date
 from pathlib import Path
 
-from fastapi import APIRouter, HTTPException, Request
+import orjson
+from fastapi import APIRouter, HTTPException, Request, Response
 
 from ..models import StateResponse, UserSlotState
-from ..utils.filelock import read_lock, write_lock
+from ..utils.etag import check_not_modified, file_etag
+from ..utils.filelock import write_lock
 
 router = APIRouter()
 
@@ -18,32 +21,53 @@ def get_state_path(request: Request) -> str:
 
 
 def load_state(state_path: str) -> dict:
-    """Load state from JSON file."""
+    """Load state from JSON file.
+
+    No lock needed: both writers replace the file via rename, so a single
+    open() always sees a complete snapshot.
+    """
     path = Path(state_path)
     if not path.exists():
         return {"users": {}}
 
-    with read_lock(state_path):
-        with open(path) as f:
-            return json.load(f)
+    with open(path, 'rb') as f:
+        return orjson.loads(f.read())
 
 
 def save_state(state_path: str, state: dict):
     """Save state to JSON file (atomic write, same lock as the notify engine)."""
     path = Path(state_path)
     path.parent.mkdir(parents=True, exist_ok=True)
-    tmp_path = path.with_suffix(".tmp")
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    data = orjson.dumps(state, option=orjson.OPT_INDENT_2)
 
     with write_lock(state_path):
-        with open(tmp_path, 'w') as f:
-            json.dump(state, f, indent=2)
-        tmp_path.replace(path)
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    _invalidate_summary()
+
+
+# Last /today summary: ((st_mtime_ns, st_size, date), summary). The notify
+# engine only touches state.json a few times a day, so polling clients mostly
+# hit this instead of re-parsing the file.
+_summary_cache: tuple = (None, None)
+
+
+def _invalidate_summary():
+    global _summary_cache
+    _summary_cache = (None, None)
 
 
 @router.get("/", response_model=StateResponse)
-async def get_state(request: Request):
+def get_state(request: Request, response: Response):
     """Get full notification state."""
     state_path = get_state_path(request)
+    not_modified = check_not_modified(request, response, file_etag(state_path))
+    if not_modified:
+        return not_modified
 
     try:
         state = load_state(state_path)
@@ -65,9 +89,12 @@ async def get_state(request: Request):
 
 
 @router.get("/user/{name}", response_model=UserSlotState)
-async def get_user_state(request: Request, name: str):
+def get_user_state(request: Request, response: Response, name: str):
     """Get state for a specific user."""
     state_path = get_state_path(request)
+    not_modified = check_not_modified(request, response, file_etag(state_path))
+    if not_modified:
+        return not_modified
 
     try:
         state = load_state(state_path)
@@ -89,7 +116,7 @@ async def get_user_state(request: Request, name: str):
 
 
 @router.delete("/user/{name}/today")
-async def clear_user_today(request: Request, name: str):
+def clear_user_today(request: Request, name: str):
     """Clear today's state for a user (allows re-sending notifications)."""
     state_path = get_state_path(request)
 
@@ -114,7 +141,7 @@ async def clear_user_today(request: Request, name: str):
 
 
 @router.delete("/")
-async def clear_all_state(request: Request):
+def clear_all_state(request: Request):
     """Clear all state (allows re-sending all notifications)."""
     state_path = get_state_path(request)
 
@@ -123,10 +150,23 @@ async def clear_all_state(request: Request):
 
 
 @router.get("/today")
-async def get_today_summary(request: Request):
+def get_today_summary(request: Request, response: Response):
     """Get summary of today's notifications."""
+    global _summary_cache
     state_path = get_state_path(request)
     today = date.today().isoformat()
+    not_modified = check_not_modified(request, response, file_etag(state_path, today))
+    if not_modified:
+        return not_modified
+
+    try:
+        st = os.stat(state_path)
+        version = (st.st_mtime_ns, st.st_size, today)
+    except OSError:
+        version = None
+    cached_version, cached_summary = _summary_cache
+    if version is not None and cached_version == version:
+        return cached_summary
 
     try:
         state = load_state(state_path)
@@ -154,4 +194,6 @@ async def get_today_summary(request: Request):
                 "last_sent": None,
             }
 
+    if version is not None:
+        _summary_cache = (version, summary)
     return summary
@@ -1,35 +1,90 @@
 """Test notification trigger API endpoints."""
 
+import asyncio
+import io
+import logging
 import os
-import subprocess
-import sys
-from pathlib import Path
+import threading
 
 from fastapi import APIRouter, HTTPException, Request, Query
 
 from ..models import TestTriggerResponse
-from ..utils.envfile import parse_env_line
+from .secrets import ENV_PATH, load_config, load_env_file
 
-ENV_PATH = os.environ.get("ENV_PATH", "/app/.env")
 
-
-def load_env_for_subprocess() -> dict:
+def load_env_for_notify() -> dict:
     """Load .env file and merge with current environment.
 
     The dashboard container's os.environ is frozen at startup, so secrets
     added after startup (e.g. via the wizard) won't be present. This reads
-    the .env file fresh every time so the notify module gets up-to-date values.
+    the .env file (via the shared mtime-checked cache) so the notify module
+    gets up-to-date values.
     """
     env = os.environ.copy()
-    env_file = Path(ENV_PATH)
-    if env_file.exists():
-        with open(env_file) as f:
-            for line in f:
-                parsed = parse_env_line(line)
-                if parsed:
-                    env[parsed[0]] = parsed[1]
+    env.update(load_env_file(ENV_PATH))
     return env
 
+
+# The notify run logs through one shared logger, so test triggers run one at a
+# time to keep their captured output separate. A thread can't be killed, only
+# asked to stop via its cancel event, so after a timeout the lock is released
+# by the worker itself once the run has drained; until then new triggers get
+# a 409 instead of queueing behind it.
+_trigger_lock = asyncio.Lock()
+_draining = False
+
+TRIGGER_TIMEOUT = 120  # seconds
+
+
+def run_notify_captured(config_path: str, slot: int, dry_run: bool, cancel: threading.Event = None) -> tuple:
+    """Run one notify slot in-process, returning (exit_code, log_output)."""
+    from notify.__main__ import run
+
+    logger = logging.getLogger("immich-memories-notify")
+    buffer = io.StringIO()
+    handler = logging.StreamHandler(buffer)
+    handler.setFormatter(logging.Formatter(
+        "%(asctime)s [%(levelname)s] %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S",
+    ))
+    try:
+        log_level = (load_config(config_path).get("settings") or {}).get("log_level", "INFO")
+    except Exception:
+        log_level = "INFO"
+    previous_level = logger.level
+    logger.addHandler(handler)
+    logger.setLevel(getattr(logging, str(log_level).upper(), logging.INFO))
+    try:
+        returncode = run(
+            config_path=config_path,
+            slot=slot,
+            test_mode=True,
+            dry_run=dry_run,
+            no_delay=True,
+            logger=logger,
+            env=load_env_for_notify(),
+            cancel=cancel,
+        )
+    except Exception:
+        logger.exception("Notification run crashed")
+        returncode = 1
+    finally:
+        logger.removeHandler(handler)
+        logger.setLevel(previous_level)
+    return returncode, buffer.getvalue()
+
+
+def _set_draining(value: bool):
+    global _draining
+    _draining = value
+
+
+def _release_trigger(worker: asyncio.Future):
+    """Done-callback of a trigger's worker: the run has ended, free the lock."""
+    _set_draining(False)
+    _trigger_lock.release()
+
+
 router = APIRouter()
 
 
@@ -55,60 +110,55 @@ async def trigger_test_notification(
         raise HTTPException(status_code=400, detail="Slot must be between 1 and 10")
 
     config_path = get_config_path(request)
-
-    # Build command
-    cmd = [
-        sys.executable,
-        "-m", "notify",
-        "--config", config_path,
-        "--slot", str(slot),
-        "--test",
-        "--no-delay",
-    ]
-
-    if dry_run:
-        cmd.append("--dry-run")
+    if _draining:
+        raise HTTPException(status_code=409, detail="A timed-out test run is still stopping, try again shortly")
 
     try:
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=120,  # 2 minute timeout
-            cwd="/app",
-            env=load_env_for_subprocess(),
-        )
-
-        success = result.returncode == 0
-        output = result.stdout + result.stderr
-
-        if success:
-            message = f"Test notification for slot {slot} {'simulated' if dry_run else 'sent'} successfully"
-        else:
-            message = f"Test notification failed with return code {result.returncode}"
-
-        return TestTriggerResponse(
-            success=success,
-            message=message,
-            output=output[-2000:] if output else None,  # Limit output size
-        )
-
-    except subprocess.TimeoutExpired:
+        await _trigger_lock.acquire()
+        cancel = threading.Event()
+        try:
+            worker = asyncio.ensure_future(
+                asyncio.to_thread(run_notify_captured, config_path, slot, dry_run, cancel)
+            )
+        except BaseException:
+            _trigger_lock.release()
+            raise
+        worker.add_done_callback(_release_trigger)
+        try:
+            returncode, output = await asyncio.wait_for(asyncio.shield(worker), timeout=TRIGGER_TIMEOUT)
+        finally:
+            if not worker.done():
+                # Timed out (or the request was cancelled): ask the run to
+                # stop and answer now; _release_trigger frees the lock later
+                _set_draining(True)
+                cancel.set()
+    except asyncio.TimeoutError:
         raise HTTPException(status_code=504, detail="Notification script timed out")
-    except FileNotFoundError:
+    except ImportError:
         raise HTTPException(status_code=500, detail="Notification script not found")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error running notification: {str(e)}")
 
+    success = returncode == 0
+
+    if success:
+        message = f"Test notification for slot {slot} {'simulated' if dry_run else 'sent'} successfully"
+    else:
+        message = f"Test notification failed with return code {returncode}"
+
+    return TestTriggerResponse(
+        success=success,
+        message=message,
+        output=output[-2000:] if output else None,  # Limit output size
+    )
+
 
 @router.get("/slots")
 async def get_available_slots(request: Request):
     """Get information about available notification slots from config."""
-    import yaml
     config_path = get_config_path(request)
     try:
-        with open(config_path) as f:
-            config = yaml.safe_load(f)
+        config = load_config(config_path)
     except Exception:
         config = {}
 
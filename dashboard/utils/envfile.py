@@ -7,14 +7,17 @@ secrets with those characters come back corrupted (e.g. pa$s -> pa\$s).
 
 import re
 
+_ESCAPE_RE = re.compile(r'\\(.)')
+
 
 def unquote_env_value(value: str) -> str:
     """Strip surrounding quotes and undo backslash escapes from a .env value."""
     value = value.strip()
-    if len(value) >= 2 and value[0] == '"' and value[-1] == '"':
-        return re.sub(r'\\(.)', r'\1', value[1:-1])
-    if len(value) >= 2 and value[0] == "'" and value[-1] == "'":
-        return value[1:-1]
+    if len(value) >= 2 and value[0] == value[-1]:
+        if value[0] == '"':
+            return _ESCAPE_RE.sub(r'\1', value[1:-1])
+        if value[0] == "'":
+            return value[1:-1]
     return value
 
 
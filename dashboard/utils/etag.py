@@ -0,0 +1,33 @@
+"""Conditional GET helpers: weak ETags derived from a backing file's stat."""
+
+import os
+from typing import Optional
+
+from fastapi import Request, Response
+
+
+def file_etag(path: str, *extra) -> Optional[str]:
+    """Weak ETag from path's mtime and size (plus any extra parts), or None if missing."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    tag = "-".join([f"{st.st_mtime_ns:x}", f"{st.st_size:x}", *map(str, extra)])
+    return f'W/"{tag}"'
+
+
+def check_not_modified(request: Request, response: Response, etag: Optional[str]) -> Optional[Response]:
+    """Tag the response with etag; return a 304 if the client already has it.
+
+    Usage:
+        not_modified = check_not_modified(request, response, file_etag(path))
+        if not_modified:
+            return not_modified
+    """
+    if etag is None:
+        return None
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
@@ -1,10 +1,113 @@
 """File locking utility for concurrent access protection."""
 
+import atexit
 import fcntl
 import os
+import threading
 from contextlib import contextmanager
 from pathlib import Path
-from typing import Generator
+from typing import Dict, Generator
+
+# Shared (read) locks only need to exclude writers, and the dashboard is the
+# sole writer of the files it read-locks (config.yaml, .env; state.json reads
+# don't lock at all). With a single uvicorn worker the in-process RW lock below
+# already provides that, so read_lock skips flock(). Exclusive locks always
+# take flock() too, so the notify process never sees a half-written file.
+_FLOCK_READS = int(os.environ.get("UVICORN_WORKERS", "1")) > 1
+
+
+class _PathLock:
+    """In-process reader/writer lock paired with the path's flock() fd.
+
+    flock() locks belong to the open file description, so threads sharing
+    the cached fd don't exclude each other. Readers and writers are
+    arbitrated here (writers preferred), and flock() is only taken at the
+    process boundary: by the first/last reader when _FLOCK_READS is set, and
+    by every writer.
+    """
+
+    def __init__(self, fd: int):
+        self.fd = fd
+        self._cond = threading.Condition()
+        self._readers = 0
+        self._writer = False
+        self._writers_waiting = 0
+
+    def acquire_read(self):
+        with self._cond:
+            while self._writer or self._writers_waiting:
+                self._cond.wait()
+            if self._readers == 0 and _FLOCK_READS:
+                fcntl.flock(self.fd, fcntl.LOCK_SH)
+            self._readers += 1
+
+    def release_read(self):
+        with self._cond:
+            self._readers -= 1
+            if self._readers == 0:
+                if _FLOCK_READS:
+                    fcntl.flock(self.fd, fcntl.LOCK_UN)
+                self._cond.notify_all()
+
+    def acquire_write(self):
+        with self._cond:
+            self._writers_waiting += 1
+            try:
+                while self._writer or self._readers:
+                    self._cond.wait()
+            finally:
+                self._writers_waiting -= 1
+            self._writer = True
+        try:
+            fcntl.flock(self.fd, fcntl.LOCK_EX)
+        except BaseException:
+            self._release_writer()
+            raise
+
+    def release_write(self):
+        try:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+        finally:
+            self._release_writer()
+
+    def _release_writer(self):
+        with self._cond:
+            self._writer = False
+            self._cond.notify_all()
+
+
+# One lock fd per path, opened once and kept for the life of the process.
+_path_locks: Dict[str, _PathLock] = {}
+_path_locks_guard = threading.Lock()
+
+
+def _get_path_lock(filepath: str) -> _PathLock:
+    """Return the cached _PathLock for filepath's .lock file."""
+    entry = _path_locks.get(filepath)
+    if entry is not None:
+        return entry
+    with _path_locks_guard:
+        entry = _path_locks.get(filepath)
+        if entry is None:
+            # Lock file sits next to the target so it is shared across
+            # containers via bind mounts, and matches the lock path used by
+            # notify/config.py.
+            lock_path = Path(str(filepath) + '.lock')
+            lock_path.parent.mkdir(parents=True, exist_ok=True)
+            fd = os.open(lock_path, os.O_CREAT | os.O_RDWR, 0o644)
+            entry = _path_locks[filepath] = _PathLock(fd)
+        return entry
+
+
+@atexit.register
+def _close_lock_fds():
+    with _path_locks_guard:
+        for entry in _path_locks.values():
+            try:
+                os.close(entry.fd)
+            except OSError:
+                pass
+        _path_locks.clear()
 
 
 @contextmanager
@@ -21,19 +124,19 @@ def file_lock(filepath: str, exclusive: bool = True) -> Generator[None, None, No
             # Safe to read/write the file
             pass
     """
-    # Lock file sits next to the target so it is shared across containers via
-    # bind mounts, and matches the lock path used by notify/config.py.
-    lock_path = Path(str(filepath) + '.lock')
-    lock_path.parent.mkdir(parents=True, exist_ok=True)
-
-    lock_file = open(lock_path, 'w')
-    try:
-        lock_type = fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH
-        fcntl.flock(lock_file.fileno(), lock_type)
-        yield
-    finally:
-        fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
-        lock_file.close()
+    lock = _get_path_lock(str(filepath))
+    if exclusive:
+        lock.acquire_write()
+        try:
+            yield
+        finally:
+            lock.release_write()
+    else:
+        lock.acquire_read()
+        try:
+            yield
+        finally:
+            lock.release_read()
 
 
 @contextmanager
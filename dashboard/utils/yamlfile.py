@@ -0,0 +1,99 @@
+"""YAML load/dump helpers shared by the dashboard.
+
+Parsing uses libyaml's CSafeLoader when PyYAML was built with it (several
+times faster than the pure-Python loader). Dumping deliberately stays on the
+pure-Python SafeDumper: libyaml's emitter escapes emoji as \\U0001F382 even with
+allow_unicode=True, which would mangle the hand-edited message templates.
+"""
+
+import os
+
+import orjson
+import yaml
+
+from .filelock import read_lock
+
+YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+class YamlDumper(yaml.SafeDumper):
+    """SafeDumper without anchor/alias tracking.
+
+    Config values are plain trees, so the per-node id() bookkeeping the
+    serializer does to find shared objects is pure overhead. It would also
+    turn a list that happens to be reused in two places into &id001/*id001
+    anchors, which hand editors of config.yaml don't expect.
+    """
+
+    def ignore_aliases(self, data):
+        return True
+
+
+def load_yaml(stream):
+    """Parse a YAML document with the safe loader."""
+    return yaml.load(stream, Loader=YamlLoader)
+
+
+def dump_yaml(data, stream=None):
+    """Write data as block-style YAML, keeping key order and unicode as-is.
+
+    Returns the document as a string when no stream is given.
+    """
+    return yaml.dump(data, stream, Dumper=YamlDumper, default_flow_style=False, allow_unicode=True, sort_keys=False)
+
+
+# Parsed YAML files keyed by path -> ((st_mtime_ns, st_size), data)
+_file_cache: dict = {}
+
+
+def load_yaml_file(path: str) -> dict:
+    """Load a YAML mapping from path (shared lock), cached by mtime and size.
+
+    The returned dict is shared between callers and must be treated as
+    read-only; read-modify-write paths should parse the file themselves.
+    Raises FileNotFoundError if the file does not exist.
+    """
+    st = os.stat(path)
+    version = (st.st_mtime_ns, st.st_size)
+    cached = _file_cache.get(path)
+    if cached and cached[0] == version:
+        return cached[1]
+
+    with read_lock(path):
+        with open(path) as f:
+            data = load_yaml(f) or {}
+
+    _file_cache[path] = (version, data)
+    return data
+
+
+def invalidate_yaml_file(path: str):
+    """Drop the cached parse of path (call after writing it)."""
+    _file_cache.pop(path, None)
+
+
+def write_yaml_snapshot(path: str, data):
+    """Write data next to path as <path>.cache.json, tagged with the file's mtime/size.
+
+    notify/config.py loads this snapshot instead of re-parsing the YAML when
+    the tag still matches, so cron runs after a dashboard save skip PyYAML.
+    Best effort: a failed write, or data that JSON can't round-trip exactly
+    (e.g. YAML dates), only means the next run parses the YAML.
+    """
+    snapshot = f"{path}.cache.json"
+    tmp_path = f"{snapshot}.{os.getpid()}.tmp"
+    try:
+        st = os.stat(path)
+        blob = orjson.dumps({"version": [st.st_mtime_ns, st.st_size], "data": data})
+        if orjson.loads(blob)["data"] != data:
+            return
+        with open(tmp_path, "wb") as f:
+            f.write(blob)
+        os.replace(tmp_path, snapshot)
+    except (TypeError, ValueError):
+        return
+    except OSError:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
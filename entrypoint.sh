@@ -15,7 +15,13 @@ crond -l 2
 trap 'kill $UVICORN_PID; wait $UVICORN_PID' TERM INT
 
 # Start uvicorn in background so shell stays PID 1 (reaps zombies)
-uvicorn dashboard.main:app --host 0.0.0.0 --port ${DASHBOARD_PORT:-5000} &
+# uvloop + httptools ship with uvicorn[standard]. Keep a single worker by
+# default: the dashboard serializes config/.env writes and test triggers
+# in-process, so extra workers only help read-heavy deployments.
+uvicorn dashboard.main:app --host 0.0.0.0 --port ${DASHBOARD_PORT:-5000} \
+    --loop uvloop --http httptools --timeout-keep-alive 30 \
+    --workers ${UVICORN_WORKERS:-1} \
+    --limit-concurrency ${UVICORN_LIMIT_CONCURRENCY:-256} &
 UVICORN_PID=$!
 
 # Wait for uvicorn — if it dies, container exits
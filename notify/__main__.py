@@ -8,14 +8,20 @@ Usage:
     python -m notify --slot 1 --test # Test mode (uses any available date)
     python -m notify --slot 1 --dry-run # Show what would be sent without sending
     python -m notify --check-updates # Check GitHub for new releases
+    python -m notify --daemon        # Stay resident and run every slot on schedule (no update checks)
 """
 
 import argparse
+import copy
 import logging
 import random
+import signal
 import sys
-import time
-from datetime import date, datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Optional
 
 from .config import (
     get_assets_sent_today,
@@ -38,12 +44,25 @@ from .features.trip import find_trip_candidate, prepare_trip_notification
 from .immich import (
     fetch_memories,
     fetch_people,
-    filter_todays_memories,
     get_top_persons,
-    parse_memories,
+    index_memories_by_date,
+    list_memory_years,
+    load_api_cache,
+    prune_thumbnail_disk_cache,
+    save_api_cache,
+    set_thumbnail_disk_cache,
 )
 from .ntfy import send_single_notification
-from .utils import calculate_random_delay, with_retry
+from .update_check import check_for_updates
+from .utils import (
+    MAX_USER_WORKERS,
+    calculate_random_delay,
+    session,
+    shutdown_requested,
+    unwatch_cancel,
+    watch_cancel,
+    with_retry,
+)
 
 
 def process_user_slot(
@@ -119,6 +138,17 @@ def process_user_slot(
     # Get assets already sent today to avoid duplicates
     assets_sent = get_assets_sent_today(state, name, target_date)
 
+    # People are needed later (birthdays, top persons) and don't depend on the
+    # memories response, so fetch them in the background meanwhile
+    people_pool = ThreadPoolExecutor(max_workers=1)
+    people_future = people_pool.submit(
+        with_retry,
+        lambda: fetch_people(immich_url, api_key),
+        max_attempts=retry_config["max_attempts"],
+        delay=retry_config["delay_seconds"],
+        logger=logger,
+    )
+
     # Fetch memories with retry
     try:
         memories = with_retry(
@@ -128,51 +158,58 @@ def process_user_slot(
             logger=logger,
         )
     except Exception as e:
+        # Nothing will read the people result now; drop it if not yet started
+        people_future.cancel()
         logger.error(f"  [{name}] Failed to fetch memories: {e}")
         result["success"] = False
         return result
+    finally:
+        # No more work for this pool; its thread exits once the fetch is done
+        people_pool.shutdown(wait=False)
 
     # Filter for today
-    todays = filter_todays_memories(memories, target_date)
+    memories_by_date = index_memories_by_date(memories)
+    todays = memories_by_date.get(target_date.isoformat(), [])
 
     # In test mode, find any date with memories
     if test_mode and not todays:
         for memory in memories[:10]:
             show_at = memory.get("showAt", "")
             if show_at:
-                test_date = datetime.strptime(show_at[:10], "%Y-%m-%d").date()
-                todays = filter_todays_memories(memories, test_date)
+                test_date = show_at[:10]
+                todays = memories_by_date.get(test_date, [])
                 if todays:
                     logger.info(f"  [{name}] Test mode: using date {test_date}")
                     break
 
-    # Parse memories by year
-    parsed = parse_memories(todays) if todays else {"years": [], "by_year": {}}
-    has_memories = bool(parsed["years"])
+    # Years with memories; assets are only collected for the year this slot sends
+    memory_years = list_memory_years(todays) if todays else []
+    has_memories = bool(memory_years)
 
     if has_memories:
-        logger.debug(f"  [{name}] Memories: {parsed['total_assets']} assets ({parsed['image_count']} images, {parsed['video_count']} videos)")
+        logger.debug(f"  [{name}] Memories: {len(memory_years)} years ({', '.join(map(str, memory_years))})")
 
-    # Fetch all people once (shared by birthday check and top persons)
+    # All people, fetched once (shared by birthday check and top persons)
     try:
-        all_people = with_retry(
-            lambda: fetch_people(immich_url, api_key),
-            max_attempts=retry_config["max_attempts"],
-            delay=retry_config["delay_seconds"],
-            logger=logger,
-        )
+        all_people = people_future.result()
     except Exception as e:
         logger.warning(f"  [{name}] Could not fetch people: {e}")
         all_people = []
 
-    # Get top persons for this user
-    try:
-        top_persons = get_top_persons(immich_url, api_key, limit=top_persons_limit, logger=logger, people=all_people)
-        top_person_ids = {p["id"] for p in top_persons}
-    except Exception as e:
-        logger.warning(f"  [{name}] Could not fetch top persons: {e}")
-        top_persons = []
-        top_person_ids = set()
+    # Top persons for this user, computed on first use: birthday slots, days
+    # without memories and memory slots with no real face choice (a single
+    # candidate, or no named faces) never need the per-person count queries
+    top_persons = None
+
+    def user_top_persons() -> list:
+        nonlocal top_persons
+        if top_persons is None:
+            try:
+                top_persons = get_top_persons(immich_url, api_key, limit=top_persons_limit, logger=logger, people=all_people)
+            except Exception as e:
+                logger.warning(f"  [{name}] Could not fetch top persons: {e}")
+                top_persons = []
+        return top_persons
 
     # Determine what to send for this slot
     notification = None
@@ -299,7 +336,7 @@ def process_user_slot(
                         candidate = find_then_and_now_candidate(
                             immich_url=immich_url,
                             api_key=api_key,
-                            top_persons=top_persons,
+                            top_persons=user_top_persons(),
                             target_date=target_date,
                             min_gap=tan_min_gap,
                             year_range=year_range,
@@ -325,10 +362,11 @@ def process_user_slot(
             if not notification:
                 # Normal memory notification (fallback or non-special slot)
                 notification = prepare_memory_notification(
-                    parsed=parsed,
+                    memories=todays,
+                    years=memory_years,
                     slot=slot,
                     assets_sent=assets_sent,
-                    top_person_ids=top_person_ids,
+                    top_person_ids=lambda: {p["id"] for p in user_top_persons()},
                     immich_url=immich_url,
                     api_key=api_key,
                     messages=messages,
@@ -357,7 +395,7 @@ def process_user_slot(
                 )
             if not notification:
                 notification = prepare_person_notification(
-                    top_persons=top_persons,
+                    top_persons=user_top_persons(),
                     assets_sent=assets_sent,
                     immich_url=immich_url,
                     api_key=api_key,
@@ -392,7 +430,7 @@ def process_user_slot(
                 )
             if not notification:
                 notification = prepare_person_notification(
-                    top_persons=top_persons,
+                    top_persons=user_top_persons(),
                     assets_sent=assets_sent,
                     immich_url=immich_url,
                     api_key=api_key,
@@ -492,11 +530,15 @@ Examples:
   python -m notify --slot 1 --dry-run # Preview slot 1 without sending
   python -m notify --slot 1 --force   # Force send even if already sent
   python -m notify --slot 1 --no-delay # Send immediately without random delay
+  python -m notify --daemon          # Run every slot in its window, instead of cron (no update checks)
         """,
     )
     parser.add_argument("--config", default="config.yaml", help="Path to config file")
     parser.add_argument("--slot", type=int, help="Notification slot number (1, 2, 3, ...)")
     parser.add_argument("--check-updates", action="store_true", help="Check for new releases on GitHub")
+    parser.add_argument("--daemon", action="store_true",
+                        help="Stay resident and run every notification slot in its window "
+                             "(update checks are not scheduled; run --check-updates separately)")
     parser.add_argument("--test", action="store_true", help="Test mode (minimal delays, use any date)")
     parser.add_argument("--dry-run", action="store_true", help="Show what would be sent")
     parser.add_argument("--force", action="store_true", help="Force send even if already sent today")
@@ -505,50 +547,222 @@ Examples:
     args = parser.parse_args()
 
     if args.check_updates:
-        from .update_check import check_for_updates
         logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s", datefmt="%Y-%m-%d %H:%M:%S")
         logger = logging.getLogger("immich-memories-notify")
         return check_for_updates(config_path=args.config, logger=logger)
 
-    if not args.slot:
-        parser.error("--slot is required (unless using --check-updates)")
+    if not args.slot and not args.daemon:
+        parser.error("--slot is required (unless using --check-updates or --daemon)")
+
+    target_date = None
+    if args.date:
+        try:
+            target_date = datetime.strptime(args.date, "%Y-%m-%d").date()
+        except ValueError:
+            print(f"Invalid date format: {args.date} (use YYYY-MM-DD)")
+            return 1
+
+    # cron/docker stop send SIGTERM. Only flag the shutdown: waits (slot
+    # delay, retry backoff, the daemon's sleep) return early, users that
+    # haven't started are skipped, and run() still merges and saves every
+    # user that finished, so notifications already sent are recorded.
+    received = []
+
+    def _shutdown(signum, frame):
+        received.append(signum)
+        shutdown_requested.set()
+
+    signal.signal(signal.SIGTERM, _shutdown)
+    signal.signal(signal.SIGINT, _shutdown)
 
-    # Load config first to get log settings
     try:
-        config = load_config(args.config)
+        if args.daemon:
+            code = run_daemon(
+                config_path=args.config,
+                test_mode=args.test,
+                dry_run=args.dry_run,
+                force=args.force,
+                no_delay=args.no_delay,
+            )
+        else:
+            code = run(
+                config_path=args.config,
+                slot=args.slot,
+                test_mode=args.test,
+                dry_run=args.dry_run,
+                force=args.force,
+                no_delay=args.no_delay,
+                target_date=target_date,
+            )
+        return 128 + received[0] if received else code
+    finally:
+        # In-process callers (the dashboard) keep the pool warm between runs
+        session.close()
+
+
+def _window_bounds(window: dict, day: date) -> Optional[tuple]:
+    """Return (start, end) datetimes of a notification window on day, or None."""
+    try:
+        start_hour, start_min = map(int, window["start"].split(":"))
+        end_hour, end_min = map(int, window["end"].split(":"))
+    except (AttributeError, KeyError, TypeError, ValueError):
+        return None
+    start = datetime.combine(day, datetime.min.time()).replace(hour=start_hour, minute=start_min)
+    end = start.replace(hour=end_hour, minute=end_min)
+    # Overnight windows (e.g. 23:00 to 01:00)
+    if end <= start:
+        end += timedelta(days=1)
+    return start, end
+
+
+def _next_due_slot(notification_windows: list, now: datetime, done: set) -> Optional[tuple]:
+    """Return (slot, day, start) for the earliest slot still due, or None.
+
+    A slot is due on a day until its window ends, unless (day, slot) is in
+    done. start is in the past when the window is already open, so a slot
+    whose start passed during a previous run's random delay still runs.
+    """
+    for day in (now.date(), now.date() + timedelta(days=1)):
+        due = []
+        for slot, window in enumerate(notification_windows, 1):
+            if (day, slot) in done:
+                continue
+            bounds = _window_bounds(window, day)
+            if bounds is None or bounds[1] <= now:
+                continue
+            due.append((bounds[0], slot))
+        if due:
+            start, slot = min(due)
+            return slot, day, start
+    return None
+
+
+# Longest single sleep in --daemon, so window edits are picked up promptly
+DAEMON_POLL_SECONDS = 300
+
+
+def run_daemon(
+    config_path: str,
+    test_mode: bool = False,
+    dry_run: bool = False,
+    force: bool = False,
+    no_delay: bool = False,
+) -> int:
+    """Run every notification slot in its window, like the generated crontab, until shutdown.
+
+    Staying resident keeps the HTTP session (pooled TLS connections), the
+    in-memory caches and the breaker state warm from one slot to the next.
+    Config is re-read at least every DAEMON_POLL_SECONDS, so window and
+    log_level edits apply without a restart. Only notification slots are
+    scheduled: the crontab's daily --check-updates job is not. Unlike cron
+    jobs, the environment is not re-read, so secrets added to .env afterwards
+    need a restart.
+    """
+    try:
+        config = load_config(config_path)
     except Exception as e:
         print(f"Error loading config: {e}")
         return 1
-
-    # Setup logging
     settings = config.get("settings", {})
     logger = setup_logging(
         level=settings.get("log_level", "INFO"),
         log_file=settings.get("log_file"),
     )
 
-    # Determine target date
-    if args.date:
+    done = set()  # (day, slot) already run
+    announced = None
+    while not shutdown_requested.is_set():
         try:
-            target_date = datetime.strptime(args.date, "%Y-%m-%d").date()
-        except ValueError:
-            logger.error(f"Invalid date format: {args.date} (use YYYY-MM-DD)")
+            config = load_config(config_path)
+        except Exception as e:
+            logger.error(f"Error loading config, retrying: {e}")
+            shutdown_requested.wait(DAEMON_POLL_SECONDS)
+            continue
+        settings = config.get("settings", {})
+        level = getattr(logging, str(settings.get("log_level", "INFO")).upper(), logging.INFO)
+        logging.getLogger().setLevel(level)
+
+        now = datetime.now()
+        due = _next_due_slot(settings.get("notification_windows") or [], now, done)
+        if due is None:
+            logger.error("No notification windows configured, nothing to schedule")
             return 1
-    else:
+        slot, day, start = due
+        if start > now:
+            if announced != due:
+                logger.info(f"Daemon: next run is slot {slot} at {start:%Y-%m-%d %H:%M}")
+                announced = due
+            shutdown_requested.wait(min(DAEMON_POLL_SECONDS, (start - now).total_seconds()))
+            continue
+
+        done.add((day, slot))
+        done = {entry for entry in done if entry[0] >= day - timedelta(days=1)}
+        run(
+            config_path=config_path,
+            slot=slot,
+            test_mode=test_mode,
+            dry_run=dry_run,
+            force=force,
+            no_delay=no_delay,
+            logger=logger,
+        )
+    return 0
+
+
+def run(
+    config_path: str,
+    slot: int,
+    test_mode: bool = False,
+    dry_run: bool = False,
+    force: bool = False,
+    no_delay: bool = False,
+    target_date: date = None,
+    logger: logging.Logger = None,
+    env: dict = None,
+    cancel: threading.Event = None,
+) -> int:
+    """Send notifications for one slot to all enabled users.
+
+    Used by the CLI and called in-process by the dashboard's test trigger.
+    Pass logger to route output somewhere other than the configured log
+    handlers, and env to expand ${VAR} references from a mapping other than
+    os.environ. Once cancel is set, users that haven't started are skipped
+    and retry backoff ends early.
+    Returns a process exit code (0 when every user succeeded).
+    """
+    # Load config first to get log settings
+    try:
+        config = load_config(config_path, env=env)
+    except Exception as e:
+        if logger:
+            logger.error(f"Error loading config: {e}")
+        else:
+            print(f"Error loading config: {e}")
+        return 1
+
+    # Setup logging
+    settings = config.get("settings", {})
+    if logger is None:
+        logger = setup_logging(
+            level=settings.get("log_level", "INFO"),
+            log_file=settings.get("log_file"),
+        )
+
+    if target_date is None:
         target_date = date.today()
 
     logger.info("=" * 60)
     logger.info("Immich Memories Notify")
     logger.info("=" * 60)
     logger.info(f"Date:    {target_date}")
-    logger.info(f"Slot:    {args.slot}")
-    logger.info(f"Config:  {args.config}")
+    logger.info(f"Slot:    {slot}")
+    logger.info(f"Config:  {config_path}")
 
-    if args.test:
+    if test_mode:
         logger.info("Mode:    TEST")
-    if args.dry_run:
+    if dry_run:
         logger.info("Mode:    DRY RUN")
-    if args.force:
+    if force:
         logger.info("Mode:    FORCE")
 
     # Get notification windows
@@ -560,30 +774,40 @@ Examples:
     ])
 
     # Calculate and apply random delay for this slot's window
-    if not args.no_delay and not args.dry_run:
-        if args.slot <= len(notification_windows):
-            window = notification_windows[args.slot - 1]
+    if not no_delay and not dry_run:
+        if slot <= len(notification_windows):
+            window = notification_windows[slot - 1]
             delay_seconds = calculate_random_delay(
                 window["start"],
                 window["end"],
-                test_mode=args.test,
+                test_mode=test_mode,
             )
 
             if delay_seconds > 0:
                 delay_minutes = delay_seconds // 60
                 logger.info(f"Window:  {window['start']} - {window['end']}")
-                if args.test:
+                if test_mode:
                     logger.info(f"Delay:   {delay_seconds} seconds (test mode)")
                 else:
                     logger.info(f"Delay:   ~{delay_minutes} minutes")
-                time.sleep(delay_seconds)
+                shutdown_requested.wait(delay_seconds)
         else:
-            logger.warning(f"No window configured for slot {args.slot}, sending immediately")
+            logger.warning(f"No window configured for slot {slot}, sending immediately")
+
+    if shutdown_requested.is_set():
+        logger.warning("Shutdown requested, skipping this slot")
+        return 1
 
     # Load state
     state_file = settings.get("state_file", "state/state.json")
     state = load_state(state_file)
 
+    # People lists and per-person asset counts, shared by the day's slot runs
+    api_cache_file = str(Path(state_file).with_name("api_cache.json"))
+    load_api_cache(api_cache_file)
+    # Thumbnails already downloaded by earlier runs
+    set_thumbnail_disk_cache(str(Path(state_file).with_name("thumbs")))
+
     # Check if this is a collage day
     collage_day = is_collage_day(settings, target_date)
     if collage_day:
@@ -601,54 +825,73 @@ Examples:
     memory_notifications = settings.get("memory_notifications", 3)
     person_notifications = settings.get("person_notifications", 1)
     total_slots = memory_notifications + person_notifications
-    is_person_slot = args.slot > memory_notifications and args.slot <= total_slots
+    is_person_slot = slot > memory_notifications and slot <= total_slots
 
     # On collage day, replace the first weekly_collage_slots person-photo slots with collage
     weekly_collage_slots = settings.get("weekly_collage_slots", person_notifications)
     use_collage_for_slot = (
         collage_day
         and is_person_slot
-        and args.slot - memory_notifications <= weekly_collage_slots
+        and slot - memory_notifications <= weekly_collage_slots
     )
 
-    # Process each user for this slot
-    success_count = 0
-
-    for user in users:
-        if use_collage_for_slot:
-            # Send collage instead of person photo for this slot
-            result = process_collage_slot(
-                user=user,
-                config=config,
-                state=state,
-                target_date=target_date,
-                slot=args.slot,
-                test_mode=args.test,
-                dry_run=args.dry_run,
-                force=args.force,
-                logger=logger,
-            )
-            if result.get("success"):
-                success_count += 1
-        else:
-            # Normal notification (memory or person photo)
-            result = process_user_slot(
-                user=user,
-                config=config,
-                state=state,
-                target_date=target_date,
-                slot=args.slot,
-                test_mode=args.test,
-                dry_run=args.dry_run,
-                force=args.force,
-                logger=logger,
-            )
-            if result["success"]:
-                success_count += 1
+    # Process users concurrently — each run is dominated by Immich/ntfy round
+    # trips. Every worker gets a private copy of its own state["users"][name]
+    # entry (all state the features touch is per user), and results are merged
+    # and saved from this thread only, so the shared dict is never mutated
+    # concurrently.
+    process = process_collage_slot if use_collage_for_slot else process_user_slot
+
+    def _process(user: dict):
+        name = user.get("name")
+        user_doc = {"users": {}}
+        if shutdown_requested.is_set() or (cancel is not None and cancel.is_set()):
+            logger.warning(f"  [{name}] Run stopping, skipping")
+            return name, user_doc, {"success": False}
+        if name in state.get("users", {}):
+            user_doc["users"][name] = copy.deepcopy(state["users"][name])
+        result = process(
+            user=user,
+            config=config,
+            state=user_doc,
+            target_date=target_date,
+            slot=slot,
+            test_mode=test_mode,
+            dry_run=dry_run,
+            force=force,
+            logger=logger,
+        )
+        return name, user_doc, result
 
-        # Save state after each user to avoid losing progress on crash
-        if not args.dry_run:
+    # State is written once when all users are done. On SIGTERM (see main())
+    # the loop still drains: users already in progress finish and are merged,
+    # the rest return at once. The finally also covers an unexpected
+    # exception, so sends that already happened are still recorded.
+    success_count = 0
+    merged = 0
+    if cancel is not None:
+        watch_cancel(cancel)
+    try:
+        with ThreadPoolExecutor(max_workers=min(MAX_USER_WORKERS, len(users))) as pool:
+            futures = {pool.submit(_process, user): user for user in users}
+            for future in as_completed(futures):
+                try:
+                    name, user_doc, result = future.result()
+                except Exception:
+                    logger.exception(f"  [{futures[future].get('name')}] Unexpected error")
+                    continue
+                if result.get("success"):
+                    success_count += 1
+                if name in user_doc["users"]:
+                    state.setdefault("users", {})[name] = user_doc["users"][name]
+                    merged += 1
+    finally:
+        if cancel is not None:
+            unwatch_cancel(cancel)
+        if merged and not dry_run:
             save_state(state_file, state)
+        save_api_cache(api_cache_file)
+        prune_thumbnail_disk_cache()
 
     logger.info("=" * 60)
     logger.info(f"Complete: {success_count}/{len(users)} users successful")
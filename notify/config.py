@@ -1,6 +1,7 @@
 """Configuration, logging, and state management."""
 
 import fcntl
+import functools
 import json
 import logging
 import os
@@ -10,6 +11,8 @@ from datetime import date, datetime
 from pathlib import Path
 from typing import Optional
 
+from .utils import json_dumps, json_dumps_indented, json_loads
+
 
 # =============================================================================
 # Logging Setup
@@ -46,50 +49,64 @@ def setup_logging(level: str = "INFO", log_file: Optional[str] = None):
 # Configuration
 # =============================================================================
 
-def expand_env_vars(value):
-    """Recursively expand environment variables in config values."""
-    if isinstance(value, str):
-        # Match ${VAR} or ${VAR:-default}
-        pattern = r'\$\{([^}:]+)(?::-([^}]*))?\}'
+# Match ${VAR} or ${VAR:-default}
+_ENV_VAR_RE = re.compile(r'\$\{([^}:]+)(?::-([^}]*))?\}')
+
 
-        def replacer(match):
-            var_name = match.group(1)
-            default = match.group(2) if match.group(2) is not None else ""
-            return os.environ.get(var_name, default)
+def _env_replacer(match, environ=os.environ):
+    var_name = match.group(1)
+    default = match.group(2) if match.group(2) is not None else ""
+    return environ.get(var_name, default)
 
-        return re.sub(pattern, replacer, value)
+
+def expand_env_vars(value, env: Optional[dict] = None):
+    """Recursively expand environment variables in config values.
+
+    Variables are looked up in env when given, otherwise in os.environ.
+    """
+    if isinstance(value, str):
+        if "${" not in value:
+            return value
+        replacer = _env_replacer if env is None else functools.partial(_env_replacer, environ=env)
+        return _ENV_VAR_RE.sub(replacer, value)
     elif isinstance(value, dict):
-        return {k: expand_env_vars(v) for k, v in value.items()}
+        return {k: expand_env_vars(v, env) for k, v in value.items()}
     elif isinstance(value, list):
-        return [expand_env_vars(item) for item in value]
+        return [expand_env_vars(item, env) for item in value]
     return value
 
 
-def load_config(config_path: str = "config.yaml") -> dict:
-    """Load configuration from YAML file with environment variable expansion."""
-    import yaml
+# Raw parsed config keyed by path -> ((st_mtime_ns, st_size), data). Only the
+# un-expanded YAML is cached; expand_env_vars() builds fresh containers, so
+# callers can mutate the returned config freely.
+_raw_config_cache: dict = {}
+
+
+def load_config(config_path: str = "config.yaml", env: Optional[dict] = None) -> dict:
+    """Load configuration from YAML file with environment variable expansion.
 
+    env overrides os.environ as the source for ${VAR} expansion.
+    """
     path = Path(config_path)
-    if not path.exists():
+    try:
+        st = path.stat()
+    except FileNotFoundError:
         raise FileNotFoundError(f"Config file not found: {config_path}")
 
-    # Shared lock (same lock file the dashboard uses) so we never read a
-    # half-written config while the dashboard is saving. Falls back to an
-    # unlocked read if the lock file can't be created (e.g. read-only dir).
-    try:
-        with open(str(path) + ".lock", "w") as lock_f:
-            fcntl.flock(lock_f, fcntl.LOCK_SH)
-            try:
-                with open(path) as f:
-                    config = yaml.safe_load(f)
-            finally:
-                fcntl.flock(lock_f, fcntl.LOCK_UN)
-    except OSError:
-        with open(path) as f:
-            config = yaml.safe_load(f)
+    key = str(path)
+    version = (st.st_mtime_ns, st.st_size)
+    cached = _raw_config_cache.get(key)
+    if cached and cached[0] == version:
+        config = cached[1]
+    else:
+        config = _load_config_snapshot(path, version)
+        if config is None:
+            config = _read_config_yaml(path)
+            _save_config_snapshot(path, version, config)
+        _raw_config_cache[key] = (version, config)
 
     # Expand environment variables
-    config = expand_env_vars(config)
+    config = expand_env_vars(config, env)
 
     # Set defaults for settings
     if "settings" not in config:
@@ -113,12 +130,80 @@ def load_config(config_path: str = "config.yaml") -> dict:
     return config
 
 
+def _snapshot_path(path: Path) -> Path:
+    return Path(str(path) + ".cache.json")
+
+
+def _load_config_snapshot(path: Path, version: tuple):
+    """Return the cached parse of config.yaml if it matches version, else None.
+
+    The snapshot (<config>.cache.json) holds {"version": [st_mtime_ns, st_size],
+    "data": ...} and is written by whichever process last parsed or saved the
+    YAML (the dashboard writes one after every save), so cron runs usually
+    skip YAML parsing. It is plain JSON: a file next to the config must never
+    be able to run code.
+    """
+    try:
+        with open(_snapshot_path(path), "rb") as f:
+            snapshot = json_loads(f.read())
+        if tuple(snapshot["version"]) == version:
+            return snapshot["data"]
+    except Exception:
+        pass
+    return None
+
+
+def _save_config_snapshot(path: Path, version: tuple, data):
+    """Best-effort write of the config snapshot (atomic rename).
+
+    Skipped when data doesn't survive a JSON round trip unchanged (e.g. an
+    unquoted YAML date), so a snapshot never changes what the config means.
+    """
+    snapshot = _snapshot_path(path)
+    tmp_path = snapshot.with_name(f"{snapshot.name}.{os.getpid()}.tmp")
+    try:
+        blob = json_dumps({"version": list(version), "data": data})
+        if json_loads(blob)["data"] != data:
+            return
+        with open(tmp_path, "wb") as f:
+            f.write(blob)
+        os.replace(tmp_path, snapshot)
+    except (TypeError, ValueError):
+        return
+    except OSError:
+        try:
+            tmp_path.unlink()
+        except OSError:
+            pass
+
+
+def _read_config_yaml(path: Path):
+    """Parse config YAML under a shared lock."""
+    import yaml
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)  # libyaml when available
+
+    # Shared lock (same lock file the dashboard uses) so we never read a
+    # half-written config while the dashboard is saving. Falls back to an
+    # unlocked read if the lock file can't be created (e.g. read-only dir).
+    try:
+        with open(str(path) + ".lock", "w") as lock_f:
+            fcntl.flock(lock_f, fcntl.LOCK_SH)
+            try:
+                with open(path) as f:
+                    return yaml.load(f, Loader=loader)
+            finally:
+                fcntl.flock(lock_f, fcntl.LOCK_UN)
+    except OSError:
+        with open(path) as f:
+            return yaml.load(f, Loader=loader)
+
+
 # =============================================================================
 # State Management (Skip if sent today)
 # =============================================================================
 
 def load_state(state_file: str) -> dict:
-    """Load state from JSON file with shared lock."""
+    """Load state from JSON file."""
     path = Path(state_file)
     if path.is_dir():
         raise RuntimeError(
@@ -126,16 +211,11 @@ def load_state(state_file: str) -> dict:
             f"Fix: on the host run:  rm -rf {path} && mkdir -p {path.parent}"
         )
     if path.exists():
-        lock_path = Path(str(path) + ".lock")
+        # No lock needed: writers always replace the file via rename, so a
+        # single open() sees a complete snapshot.
         try:
-            lock_path.parent.mkdir(parents=True, exist_ok=True)
-            with open(lock_path, "w") as lock_f:
-                fcntl.flock(lock_f, fcntl.LOCK_SH)
-                try:
-                    with open(path) as f:
-                        return json.load(f)
-                finally:
-                    fcntl.flock(lock_f, fcntl.LOCK_UN)
+            with open(path, "rb") as f:
+                return json_loads(f.read())
         except json.JSONDecodeError:
             logging.getLogger("immich-memories-notify").warning(
                 f"State file {path} is corrupted — starting with empty state"
@@ -147,7 +227,7 @@ def load_state(state_file: str) -> dict:
 
 
 def save_state(state_file: str, state: dict):
-    """Save state to JSON file (atomic write with file lock)."""
+    """Save state to JSON file (fsync'd atomic replace under the file lock)."""
     path = Path(state_file)
     if path.is_dir():
         raise RuntimeError(
@@ -156,13 +236,16 @@ def save_state(state_file: str, state: dict):
         )
     path.parent.mkdir(parents=True, exist_ok=True)
     lock_path = Path(str(path) + ".lock")
-    tmp_path = path.with_suffix(".tmp")
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    data = json_dumps_indented(state)
     with open(lock_path, "w") as lock_f:
         fcntl.flock(lock_f, fcntl.LOCK_EX)
         try:
-            with open(tmp_path, "w") as f:
-                json.dump(state, f, indent=2)
-            tmp_path.replace(path)
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
         finally:
             fcntl.flock(lock_f, fcntl.LOCK_UN)
 
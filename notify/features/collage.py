@@ -1,10 +1,12 @@
 """Weekly collage: templates, image processing, generation."""
 
+import importlib.util
 import inspect
 import json
 import logging
 import os
 import random
+import sys
 from datetime import date
 from io import BytesIO
 from pathlib import Path
@@ -15,6 +17,7 @@ from PIL import Image
 from ..config import get_slots_sent_today, mark_slot_sent
 from ..immich import (
     fetch_thumbnail,
+    fetch_thumbnails,
     get_asset_people,
     get_or_create_album,
     get_random_person_photo,
@@ -115,9 +118,6 @@ def load_custom_templates(templates_dir: str = "custom_templates"):
     if not templates_path.exists():
         return
 
-    import importlib.util
-    import sys
-
     for template_file in templates_path.glob("*.py"):
         template_name = template_file.stem
         if not template_name.replace("_", "").replace("-", "").isalnum():
@@ -191,6 +191,7 @@ def generate_weekly_collage(
         person_names = []
         exclude_days = settings.get("exclude_recent_days", 30)
 
+        picks = []
         for person in top_persons:
             result = get_random_person_photo(
                 immich_url=immich_url,
@@ -199,17 +200,18 @@ def generate_weekly_collage(
                 exclude_days=exclude_days,
                 logger=logger,
             )
-            if result:
-                asset_id = result["asset"].get("id")
-                if asset_id:
-                    try:
-                        # Use preview size for better quality collages
-                        thumb_bytes = fetch_thumbnail(immich_url, api_key, asset_id, size="preview")
-                        image_data_list.append(thumb_bytes)
-                        asset_ids.append(asset_id)
-                        person_names.append(result["person_name"])
-                    except Exception as e:
-                        logger.warning(f"Could not fetch image for {result['person_name']}: {e}")
+            if result and result["asset"].get("id"):
+                picks.append((result["asset"]["id"], result["person_name"]))
+
+        # Download the picked photos concurrently (preview size for better quality collages)
+        fetched = fetch_thumbnails(immich_url, api_key, [aid for aid, _ in picks], size="preview")
+        for (asset_id, thumb_bytes), (_, person_name) in zip(fetched, picks):
+            if isinstance(thumb_bytes, Exception):
+                logger.warning(f"Could not fetch image for {person_name}: {thumb_bytes}")
+                continue
+            image_data_list.append(thumb_bytes)
+            asset_ids.append(asset_id)
+            person_names.append(person_name)
 
         if not image_data_list:
             logger.info(f"No photos found for top people for user {user['name']}")
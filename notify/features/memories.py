@@ -1,19 +1,43 @@
 """Memory notification preparation with face preference."""
 
+import functools
 import logging
 import random
 from datetime import date
-from typing import Optional
+from typing import Callable, Optional, Union
 
-from ..immich import fetch_asset_details, select_asset_with_face_preference
+from ..immich import fetch_asset_details, parse_memory_year, select_asset_with_face_preference
 from ..utils import format_location, get_primary_album
 
 
+@functools.lru_cache(maxsize=256)
+def _format_year_message(template: str, year: int, years_ago: int, location: str, album_name: str) -> str:
+    """Format a year message template, ignoring placeholders it can't fill.
+
+    Memoized: users in the same run share years and templates, so the same
+    (template, year) pair is typically formatted once per run, not per user.
+    """
+    try:
+        return template.format(year=year, years_ago=years_ago, location=location, album_name=album_name)
+    except (KeyError, ValueError, IndexError):
+        return template.format(year=year, years_ago=years_ago)
+
+
+@functools.lru_cache(maxsize=256)
+def _format_year_title(template: str, year: int, years_ago: int) -> str:
+    """Format a year title template, falling back to the default title."""
+    try:
+        return template.format(year=year, years_ago=years_ago)
+    except (KeyError, ValueError, IndexError):
+        return f"Memories from {year}"
+
+
 def prepare_memory_notification(
-    parsed: dict,
+    memories: list,
+    years: list,
     slot: int,
     assets_sent: set,
-    top_person_ids: set,
+    top_person_ids: Union[set, Callable[[], set]],
     immich_url: str,
     api_key: str,
     messages: list,
@@ -24,8 +48,12 @@ def prepare_memory_notification(
     target_date: date = None,
     title_templates: list = None,
 ) -> Optional[dict]:
-    """Prepare a memory notification for a specific slot, preferring faces."""
-    years = parsed["years"]
+    """Prepare a memory notification for a specific slot, preferring faces.
+
+    years is list_memory_years(memories); only the slot's year is parsed.
+    top_person_ids may be a callable, evaluated only when the face
+    preference actually needs it.
+    """
     if not years:
         return None
 
@@ -37,8 +65,7 @@ def prepare_memory_notification(
     # Select year for this slot (cycle through available years)
     year_index = (slot - 1) % len(years)
     year = years[year_index]
-    year_data = parsed["by_year"].get(year, {})
-    assets = year_data.get("assets", [])
+    assets = parse_memory_year(memories, year)["assets"]
 
     if not assets:
         return None
@@ -101,19 +128,8 @@ def prepare_memory_notification(
     else:
         message_template = "You have memories from {year}!"
 
-    # Build format kwargs
-    format_kwargs = {
-        "year": year,
-        "years_ago": years_ago,
-        "location": location_str,
-        "album_name": album_name or "",
-    }
-
     # Safely format message (ignore missing placeholders)
-    try:
-        message = message_template.format(**format_kwargs)
-    except (KeyError, ValueError, IndexError):
-        message = message_template.format(year=year, years_ago=years_ago)
+    message = _format_year_message(message_template, year, years_ago, location_str, album_name or "")
 
     # Append location context if available (33% chance)
     if location_str and location_str not in message and random.random() < 0.33:
@@ -126,11 +142,7 @@ def prepare_memory_notification(
     # Build title from template
     video_emoji = settings.get("video_emoji", False)
     if title_templates:
-        title_template = random.choice(title_templates)
-        try:
-            title = title_template.format(year=year, years_ago=years_ago)
-        except (KeyError, ValueError, IndexError):
-            title = f"Memories from {year}"
+        title = _format_year_title(random.choice(title_templates), year, years_ago)
     else:
         title = f"Memories from {year}"
     if is_video and video_emoji:
@@ -84,14 +84,12 @@ def find_then_and_now_candidate(
         if len(year_assets) < 2:
             continue
 
-        years = sorted(year_assets.keys())
-        gap = max(years) - min(years)
+        then_year = min(year_assets)
+        now_year = max(year_assets)
+        gap = now_year - then_year
         if gap < min_gap:
             continue
 
-        then_year = min(years)
-        now_year = max(years)
-
         # Try random combos, skip already-used pairs
         then_options = year_assets[then_year][:]
         now_options = year_assets[now_year][:]
@@ -146,9 +144,8 @@ def find_then_and_now_candidate(
             logger.debug(f"  No Then & Now candidate found (need same person in same month across {min_gap}+ years)")
         return None
 
-    # Sort: prefer unused persons first, then largest gap
-    candidates.sort(key=lambda c: (c["person_id"] not in used, c["gap"]), reverse=True)
-    best = candidates[0]
+    # Prefer unused persons first, then largest gap (first wins on ties)
+    best = max(candidates, key=lambda c: (c["person_id"] not in used, c["gap"]))
 
     if logger:
         logger.info(f"  Then & Now candidate: {best['person_name']} ({best['then_year']} → {best['now_year']}, {best['gap']} years)")
@@ -1,27 +1,29 @@
 """Trip Highlights feature: find trip candidates, prepare notifications."""
 
+import calendar
 import logging
 import random
+import unicodedata
 from datetime import date, datetime
+from difflib import SequenceMatcher
 from io import BytesIO
 from typing import Optional
 
-import requests
 from PIL import Image
 
 from ..immich import (
-    fetch_thumbnail,
+    fetch_thumbnails,
     get_album_assets,
     get_asset_people,
     get_or_create_album,
     upload_collage_to_album,
 )
+from ..utils import json_loads, session
 from .collage import cover_crop_image
 
 
 def fetch_month_assets(immich_url: str, api_key: str, year: int, month: int, timeout: int = 30, size: int = 500) -> list:
     """Fetch IMAGE assets for a specific year+month using the search API."""
-    import calendar
     headers = {"Accept": "application/json", "x-api-key": api_key}
     last_day = calendar.monthrange(year, month)[1]
     payload = {
@@ -31,21 +33,20 @@ def fetch_month_assets(immich_url: str, api_key: str, year: int, month: int, tim
         "size": size,
         "withExif": True,
     }
-    response = requests.post(
+    response = session.post(
         f"{immich_url}/api/search/metadata",
         headers=headers,
         json=payload,
         timeout=timeout,
     )
     response.raise_for_status()
-    data = response.json()
+    data = json_loads(response.content)
     assets = data.get("assets", [])
     return assets.get("items", []) if isinstance(assets, dict) else assets
 
 
 def _normalize_city(name: str) -> str:
     """Normalize city name: lowercase, strip diacritics, collapse whitespace."""
-    import unicodedata
     nfkd = unicodedata.normalize("NFKD", name.lower())
     return "".join(c for c in nfkd if not unicodedata.combining(c)).strip()
 
@@ -57,7 +58,6 @@ def _is_home_city(city: str, home_cities) -> bool:
     if isinstance(home_cities, str):
         home_cities = [home_cities] if home_cities else []
     c = _normalize_city(city)
-    from difflib import SequenceMatcher
     for home_city in home_cities:
         h = _normalize_city(home_city)
         if not h:
@@ -236,13 +236,12 @@ def prepare_trip_notification(
 
         # Fetch thumbnails for collage
         thumbnails = []
-        for aid in selected_ids:
-            try:
-                data = fetch_thumbnail(immich_url, api_key, aid, size="preview")
-                thumbnails.append(data)
-                valid_ids.append(aid)
-            except Exception as e:
-                _logger.debug(f"  Could not fetch thumbnail for {aid}: {e}")
+        for aid, data in fetch_thumbnails(immich_url, api_key, selected_ids, size="preview"):
+            if isinstance(data, Exception):
+                _logger.debug(f"  Could not fetch thumbnail for {aid}: {data}")
+                continue
+            thumbnails.append(data)
+            valid_ids.append(aid)
 
         if not thumbnails:
             _logger.warning("  No thumbnails fetched for Trip Highlights collage")
@@ -289,7 +288,7 @@ def prepare_trip_notification(
             album_id = get_or_create_album(immich_url, api_key, album_name, _logger)
             if album_id:
                 headers = {"Accept": "application/json", "x-api-key": api_key, "Content-Type": "application/json"}
-                requests.put(
+                session.put(
                     f"{immich_url}/api/albums/{album_id}/assets",
                     headers=headers,
                     json={"ids": asset_ids},
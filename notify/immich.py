@@ -1,27 +1,58 @@
 """Immich API: memories, people, assets, thumbnails, albums."""
 
-import json
+import hashlib
+import heapq
 import logging
 import os
 import random
+import threading
 import time
-from collections import defaultdict
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, datetime, timedelta
-from typing import List, Optional
+from operator import itemgetter
+from typing import Callable, List, Optional, Union
 
-import requests
+from .utils import MAX_FANOUT_WORKERS, json_dumps, json_loads, session
+
+
+def _key_id(api_key: str) -> str:
+    """Short stable id for an API key, used in cache keys in place of the key."""
+    return hashlib.sha256(api_key.encode()).hexdigest()[:16]
 
 
 # =============================================================================
 # Memories API
 # =============================================================================
 
-def fetch_memories(immich_url: str, api_key: str, timeout: int = 10) -> list:
-    """Fetch all memories from Immich API."""
+# Memories responses per (immich_url, key hash) -> (fetched_at, memories). A
+# cron run fetches each user once, but the dashboard's in-process test
+# triggers and --force reruns would otherwise re-download the whole list.
+MEMORIES_CACHE_TTL = 600  # seconds
+_memories_cache = {}
+
+
+def fetch_memories(immich_url: str, api_key: str, timeout: int = 10, max_age: int = MEMORIES_CACHE_TTL) -> list:
+    """Fetch all memories from Immich API (reused for max_age seconds; 0 = always fetch).
+
+    The returned list is shared with the cache and must not be mutated.
+    """
+    cache_key = (immich_url, _key_id(api_key))
+    cached = _memories_cache.get(cache_key)
+    if cached and max_age > 0 and time.monotonic() - cached[0] < max_age:
+        return cached[1]
+
     headers = {"Accept": "application/json", "x-api-key": api_key}
-    response = requests.get(f"{immich_url}/api/memories", headers=headers, timeout=timeout)
+    response = session.get(f"{immich_url}/api/memories", headers=headers, timeout=timeout)
     response.raise_for_status()
-    return response.json()
+    memories = json_loads(response.content)
+    _memories_cache[cache_key] = (time.monotonic(), memories)
+    return memories
+
+
+def clear_memories_cache():
+    """Forget cached memories responses."""
+    _memories_cache.clear()
 
 
 def filter_todays_memories(memories: list, target_date: date = None) -> list:
@@ -29,45 +60,48 @@ def filter_todays_memories(memories: list, target_date: date = None) -> list:
     if target_date is None:
         target_date = date.today()
     target_str = target_date.isoformat()
-    return [m for m in memories if m.get("showAt", "").startswith(target_str)]
-
-
-def parse_memories(memories: list) -> dict:
-    """Parse memories into a structured format."""
-    result = {
-        "total_assets": 0,
-        "image_count": 0,
-        "video_count": 0,
-        "years": [],
-        "by_year": defaultdict(lambda: {"images": 0, "videos": 0, "assets": []}),
-        "first_asset_id": None,
-    }
+    return [m for m in memories if (show_at := m.get("showAt")) and show_at.startswith(target_str)]
+
+
+def index_memories_by_date(memories: list) -> dict:
+    """Group memories by their showAt date ("YYYY-MM-DD") in one pass."""
+    index = {}
+    for m in memories:
+        show_at = m.get("showAt")
+        if show_at:
+            index.setdefault(show_at[:10], []).append(m)
+    return index
+
 
+def list_memory_years(memories: list) -> List[int]:
+    """Return the years (newest first) that have at least one asset."""
+    years = set()
     for memory in memories:
         year = memory.get("data", {}).get("year")
-        if not year:
-            continue
+        if year and year not in years and any(a.get("id") for a in memory.get("assets", [])):
+            years.add(year)
+    return sorted(years, reverse=True)
 
-        for asset in memory.get("assets", []):
-            asset_id = asset.get("id")
-            asset_type = asset.get("type", "IMAGE")
-
-            if asset_id:
-                result["by_year"][year]["assets"].append(asset)
-                if result["first_asset_id"] is None:
-                    result["first_asset_id"] = asset_id
-
-                result["total_assets"] += 1
-                if asset_type == "VIDEO":
-                    result["video_count"] += 1
-                    result["by_year"][year]["videos"] += 1
-                else:
-                    result["image_count"] += 1
-                    result["by_year"][year]["images"] += 1
 
-    result["years"] = sorted(result["by_year"].keys(), reverse=True)
-    result["by_year"] = dict(result["by_year"])
-    return result
+def parse_memory_year(memories: list, year: int) -> dict:
+    """Collect the assets (and image/video counts) of one memory year.
+
+    Only the year a slot actually sends is parsed, instead of walking every
+    asset of every year up front.
+    """
+    entry = {"images": 0, "videos": 0, "assets": []}
+    for memory in memories:
+        if memory.get("data", {}).get("year") != year:
+            continue
+        for asset in memory.get("assets", []):
+            if not asset.get("id"):
+                continue
+            entry["assets"].append(asset)
+            if asset.get("type", "IMAGE") == "VIDEO":
+                entry["videos"] += 1
+            else:
+                entry["images"] += 1
+    return entry
 
 
 def format_notification_for_year(
@@ -138,6 +172,161 @@ def format_person_notification(
 
 MAX_THUMBNAIL_BYTES = 20 * 1024 * 1024  # 20 MB
 
+# Thumbnail cache (per-process LRU, capped by total bytes). The same asset is
+# often fetched more than once per run (shared memories across users, collage
+# retries) and, when the dashboard triggers runs in-process, across runs.
+_THUMB_CACHE_MAX_BYTES = 64 * 1024 * 1024
+_thumbnail_cache: "OrderedDict[tuple, bytes]" = OrderedDict()
+_thumbnail_cache_bytes = 0
+_thumbnail_cache_lock = threading.Lock()
+
+
+# Optional on-disk thumbnail cache shared by every run (cron slots, dashboard
+# tests): files are named by sha1 of (immich_url, asset_id, size) and pruned
+# oldest-first past THUMB_DISK_CACHE_MAX_BYTES. Enabled by run() via
+# set_thumbnail_disk_cache(); None means disabled.
+THUMB_DISK_CACHE_MAX_BYTES = 256 * 1024 * 1024
+_thumb_disk_dir: Optional[str] = None
+
+
+def set_thumbnail_disk_cache(path: Optional[str]):
+    """Enable the on-disk thumbnail cache in directory path (None disables it)."""
+    global _thumb_disk_dir
+    if path:
+        try:
+            os.makedirs(path, exist_ok=True)
+        except OSError:
+            path = None
+    _thumb_disk_dir = path
+
+
+def _thumb_disk_path(immich_url: str, asset_id: str, size: str) -> str:
+    digest = hashlib.sha1(f"{immich_url}|{asset_id}|{size}".encode("utf-8")).hexdigest()
+    return os.path.join(_thumb_disk_dir, f"{digest}.img")
+
+
+def _remember_thumbnail(cache_key: tuple, data: bytes):
+    global _thumbnail_cache_bytes
+    with _thumbnail_cache_lock:
+        if cache_key not in _thumbnail_cache:
+            _thumbnail_cache[cache_key] = data
+            _thumbnail_cache_bytes += len(data)
+        while _thumbnail_cache_bytes > _THUMB_CACHE_MAX_BYTES and len(_thumbnail_cache) > 1:
+            _, evicted = _thumbnail_cache.popitem(last=False)
+            _thumbnail_cache_bytes -= len(evicted)
+
+
+def _write_thumbnail_file(path: str, data: bytes):
+    """Atomically write data to path; best effort."""
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except OSError:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+
+
+def cached_thumbnail(immich_url: str, api_key: str, asset_id: str, size: str = "thumbnail") -> Optional[bytes]:
+    """Return a thumbnail from the in-process or on-disk cache, or None if not cached."""
+    cache_key = (immich_url, _key_id(api_key), asset_id, size)
+    with _thumbnail_cache_lock:
+        data = _thumbnail_cache.get(cache_key)
+        if data is not None:
+            _thumbnail_cache.move_to_end(cache_key)
+            return data
+
+    if _thumb_disk_dir is None:
+        return None
+    path = _thumb_disk_path(immich_url, asset_id, size)
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+        os.utime(path)  # keep recently used files out of the prune
+    except OSError:
+        return None
+    _remember_thumbnail(cache_key, data)
+    return data
+
+
+class ThumbnailDiskWriter:
+    """Tees a streamed thumbnail into the on-disk cache as it is read.
+
+    Pass write() as each chunk goes by and call close() at the end; the file
+    is kept only if exactly expected_size bytes arrived. Write errors just
+    disable the copy, never the stream. A no-op when the cache is disabled.
+    """
+
+    def __init__(self, immich_url: str, asset_id: str, expected_size: int, size: str = "thumbnail"):
+        self._expected = expected_size
+        self._written = 0
+        self._path = self._tmp_path = self._file = None
+        if _thumb_disk_dir is None:
+            return
+        self._path = _thumb_disk_path(immich_url, asset_id, size)
+        self._tmp_path = f"{self._path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            self._file = open(self._tmp_path, "wb")
+        except OSError:
+            self._file = None
+
+    def write(self, chunk: bytes):
+        if self._file is None:
+            return
+        try:
+            self._file.write(chunk)
+            self._written += len(chunk)
+        except OSError:
+            self._discard()
+
+    def close(self):
+        if self._file is None:
+            return
+        try:
+            self._file.close()
+            if self._written == self._expected:
+                os.replace(self._tmp_path, self._path)
+                return
+        except OSError:
+            pass
+        self._discard()
+
+    def _discard(self):
+        try:
+            self._file.close()
+            os.unlink(self._tmp_path)
+        except OSError:
+            pass
+        self._file = None
+
+
+def prune_thumbnail_disk_cache(max_bytes: int = THUMB_DISK_CACHE_MAX_BYTES):
+    """Delete least recently used cached thumbnails until the directory fits max_bytes."""
+    if _thumb_disk_dir is None:
+        return
+    try:
+        entries = []
+        with os.scandir(_thumb_disk_dir) as it:
+            for entry in it:
+                if entry.is_file():
+                    st = entry.stat()
+                    entries.append((st.st_mtime, st.st_size, entry.path))
+    except OSError:
+        return
+    total = sum(size for _, size, _ in entries)
+    entries.sort()
+    for _, size, path in entries:
+        if total <= max_bytes:
+            break
+        try:
+            os.unlink(path)
+            total -= size
+        except OSError:
+            pass
+
 
 def fetch_thumbnail(immich_url: str, api_key: str, asset_id: str, timeout: int = 30, size: str = "thumbnail") -> bytes:
     """Fetch thumbnail/preview image from Immich.
@@ -145,9 +334,14 @@ def fetch_thumbnail(immich_url: str, api_key: str, asset_id: str, timeout: int =
     Args:
         size: "thumbnail" (small), "preview" (medium), or "original" (full size)
     """
+    data = cached_thumbnail(immich_url, api_key, asset_id, size)
+    if data is not None:
+        return data
+
+    cache_key = (immich_url, _key_id(api_key), asset_id, size)
     headers = {"x-api-key": api_key}
     url = f"{immich_url}/api/assets/{asset_id}/thumbnail"
-    response = requests.get(url, headers=headers, params={"size": size}, timeout=timeout, stream=True)
+    response = session.get(url, headers=headers, params={"size": size}, timeout=timeout, stream=True)
     response.raise_for_status()
     content_length = int(response.headers.get("content-length", 0))
     if content_length > MAX_THUMBNAIL_BYTES:
@@ -156,40 +350,206 @@ def fetch_thumbnail(immich_url: str, api_key: str, asset_id: str, timeout: int =
     data = response.content
     if len(data) > MAX_THUMBNAIL_BYTES:
         raise ValueError(f"Thumbnail too large: {len(data)} bytes")
+
+    _remember_thumbnail(cache_key, data)
+    if _thumb_disk_dir is not None:
+        _write_thumbnail_file(_thumb_disk_path(immich_url, asset_id, size), data)
     return data
 
 
+def open_thumbnail_stream(immich_url: str, api_key: str, asset_id: str, timeout: int = 30, size: str = "thumbnail"):
+    """Open a streaming thumbnail response from Immich without reading the body.
+
+    Returns (response, content_length); the caller must close the response.
+    content_length is the exact body length, so the body must arrive
+    unencoded. Raises ValueError when it has a Content-Encoding, or its size
+    is unknown or over MAX_THUMBNAIL_BYTES, so callers can fall back to
+    fetch_thumbnail().
+    """
+    headers = {"x-api-key": api_key, "Accept-Encoding": "identity"}
+    url = f"{immich_url}/api/assets/{asset_id}/thumbnail"
+    response = session.get(url, headers=headers, params={"size": size}, timeout=timeout, stream=True)
+    try:
+        response.raise_for_status()
+        encoding = response.headers.get("content-encoding", "identity").strip().lower()
+        if encoding not in ("", "identity"):
+            raise ValueError(f"Thumbnail response is {encoding}-encoded")
+        content_length = int(response.headers.get("content-length", 0))
+        if not content_length:
+            raise ValueError("Thumbnail response has no content-length")
+        if content_length > MAX_THUMBNAIL_BYTES:
+            raise ValueError(f"Thumbnail too large: {content_length} bytes")
+    except Exception:
+        response.close()
+        raise
+    return response, content_length
+
+
+def fetch_thumbnails(
+    immich_url: str,
+    api_key: str,
+    asset_ids: List[str],
+    size: str = "thumbnail",
+    max_workers: int = 4,
+) -> list:
+    """Fetch several thumbnails concurrently.
+
+    Returns a list of (asset_id, bytes or Exception) in the same order as
+    asset_ids, so callers can skip failures without losing the pairing.
+    """
+    def _fetch(asset_id):
+        try:
+            return asset_id, fetch_thumbnail(immich_url, api_key, asset_id, size=size)
+        except Exception as e:
+            return asset_id, e
+
+    if len(asset_ids) <= 1:
+        return [_fetch(aid) for aid in asset_ids]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(asset_ids))) as pool:
+        return list(pool.map(_fetch, asset_ids))
+
+
+# =============================================================================
+# Persistent API cache
+# =============================================================================
+
+# Slow-changing API answers (people list, per-person asset counts) shared by
+# the day's slot runs. Entries are "<immich_url>|<key hash>|<name>" ->
+# {"ts": epoch seconds, "value": ...}. run() loads the file at start and saves
+# it at the end; between those it is only touched in memory. Entries are kept
+# for STALE_CACHE_MAX_AGE past their TTL so an Immich outage can fall back to
+# the last known answer instead of an empty one.
+PEOPLE_CACHE_TTL = 6 * 3600
+PERSON_COUNT_CACHE_TTL = 12 * 3600
+STALE_CACHE_MAX_AGE = 7 * 86400
+_api_cache: dict = {}
+_api_cache_dirty = False
+_api_cache_lock = threading.Lock()
+
+
+def load_api_cache(path: str):
+    """Replace the in-memory API cache with the contents of path (if readable)."""
+    global _api_cache, _api_cache_dirty
+    try:
+        with open(path, "rb") as f:
+            data = json_loads(f.read())
+    except (OSError, ValueError):
+        data = {}
+    with _api_cache_lock:
+        _api_cache = data if isinstance(data, dict) else {}
+        _api_cache_dirty = False
+
+
+def save_api_cache(path: str):
+    """Write the API cache to path (atomic rename) if it changed; best effort."""
+    global _api_cache_dirty
+    with _api_cache_lock:
+        if not _api_cache_dirty:
+            return
+        now = time.time()
+        data = {k: v for k, v in _api_cache.items() if now - v.get("ts", 0) < STALE_CACHE_MAX_AGE}
+        _api_cache_dirty = False
+    # Per-writer temp name: cron, --daemon and the dashboard may save at once
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(tmp_path, "wb") as f:
+            f.write(json_dumps(data))
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logging.getLogger("immich-memories-notify").debug(f"Could not save API cache {path}: {e}")
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+
+
+def _api_cache_get(immich_url: str, api_key: str, name: str, ttl: int):
+    entry = _api_cache.get(f"{immich_url}|{_key_id(api_key)}|{name}")
+    if entry and time.time() - entry.get("ts", 0) < ttl:
+        return entry.get("value")
+    return None
+
+
+def _api_cache_get_stale(immich_url: str, api_key: str, name: str, max_age: int = STALE_CACHE_MAX_AGE):
+    """Return (value, age in seconds) for an entry up to max_age old, else None."""
+    entry = _api_cache.get(f"{immich_url}|{_key_id(api_key)}|{name}")
+    if entry:
+        age = time.time() - entry.get("ts", 0)
+        if age < max_age:
+            return entry.get("value"), age
+    return None
+
+
+def _api_cache_put(immich_url: str, api_key: str, name: str, value):
+    global _api_cache_dirty
+    with _api_cache_lock:
+        _api_cache[f"{immich_url}|{_key_id(api_key)}|{name}"] = {"ts": time.time(), "value": value}
+        _api_cache_dirty = True
+
+
 # =============================================================================
 # People/Face Recognition API
 # =============================================================================
 
-def fetch_people(immich_url: str, api_key: str, timeout: int = 10) -> list:
-    """Fetch all recognized people from Immich API."""
+def fetch_people(immich_url: str, api_key: str, timeout: int = 10, max_age: int = PEOPLE_CACHE_TTL) -> list:
+    """Fetch all recognized people from Immich API.
+
+    Served from the API cache when fetched within max_age seconds (0 = always
+    fetch); the returned list is shared with the cache and must not be mutated.
+    If the request fails, a stale cached list (up to STALE_CACHE_MAX_AGE) is
+    returned instead of raising.
+    """
+    if max_age > 0:
+        cached = _api_cache_get(immich_url, api_key, "people", max_age)
+        if cached is not None:
+            return cached
+
     headers = {"Accept": "application/json", "x-api-key": api_key}
-    response = requests.get(f"{immich_url}/api/people", headers=headers, timeout=timeout)
-    response.raise_for_status()
-    data = response.json()
+    try:
+        response = session.get(f"{immich_url}/api/people", headers=headers, timeout=timeout)
+        response.raise_for_status()
+        data = json_loads(response.content)
+    except Exception as e:
+        stale = _api_cache_get_stale(immich_url, api_key, "people")
+        if stale is None:
+            raise
+        logging.getLogger("immich-memories-notify").warning(
+            f"Could not fetch people ({e}); using cached list from {stale[1] / 3600:.1f}h ago"
+        )
+        return stale[0]
     # API returns {"people": [...], "total": N} or just a list
     if isinstance(data, dict) and "people" in data:
-        return data["people"]
-    return data if isinstance(data, list) else []
+        people = data["people"]
+    else:
+        people = data if isinstance(data, list) else []
+    _api_cache_put(immich_url, api_key, "people", people)
+    return people
+
 
+# Page size used when sampling one random page of a person's assets
+PERSON_SAMPLE_PAGE_SIZE = 50
 
-def fetch_person_assets(immich_url: str, api_key: str, person_id: str, timeout: int = 30, size: int = 1000) -> list:
-    """Fetch assets for a specific person using search API."""
+
+def fetch_person_assets(
+    immich_url: str, api_key: str, person_id: str, timeout: int = 30, size: int = 1000, page: int = None
+) -> list:
+    """Fetch assets for a specific person using search API (1-based page if given)."""
     headers = {"Accept": "application/json", "x-api-key": api_key}
     payload = {
         "personIds": [person_id],
         "size": size,
     }
-    response = requests.post(
+    if page:
+        payload["page"] = page
+    response = session.post(
         f"{immich_url}/api/search/metadata",
         headers=headers,
         json=payload,
         timeout=timeout
     )
     response.raise_for_status()
-    data = response.json()
+    data = json_loads(response.content)
 
     # Response format: {"albums": [...], "assets": {"items": [...], ...}} or {"assets": [...]}
     assets = data.get("assets", [])
@@ -198,10 +558,11 @@ def fetch_person_assets(immich_url: str, api_key: str, person_id: str, timeout:
     return assets
 
 
-def get_top_persons(immich_url: str, api_key: str, limit: int = 5, logger=None, people: list = None) -> list:
+def get_top_persons(immich_url: str, api_key: str, limit: int = 5, logger=None, people: list = None, max_workers: int = MAX_FANOUT_WORKERS) -> list:
     """
     Get top N persons by photo count, filtered to only those with names.
-    Queries asset count for each named person using search API.
+    Queries asset count for each named person using search API (up to
+    max_workers requests in flight at once).
     Returns list of dicts with 'id', 'name', and 'asset_count'.
     """
     if people is None:
@@ -215,23 +576,26 @@ def get_top_persons(immich_url: str, api_key: str, limit: int = 5, logger=None,
 
     # Query asset count for each named person
     headers = {"Accept": "application/json", "x-api-key": api_key}
-    person_counts = []
 
-    for person in named_people:
+    def _count(person):
         person_id = person["id"]
         person_name = person["name"]
 
+        cached = _api_cache_get(immich_url, api_key, f"count:{person_id}", PERSON_COUNT_CACHE_TTL)
+        if cached is not None:
+            return {"id": person_id, "name": person_name, "asset_count": cached}
+
         try:
             # Use search API with size=1 to get total count efficiently
             payload = {"personIds": [person_id], "size": 1}
-            response = requests.post(
+            response = session.post(
                 f"{immich_url}/api/search/metadata",
                 headers=headers,
                 json=payload,
                 timeout=10
             )
             response.raise_for_status()
-            data = response.json()
+            data = json_loads(response.content)
 
             assets_data = data.get("assets", {})
             if isinstance(assets_data, dict):
@@ -239,26 +603,34 @@ def get_top_persons(immich_url: str, api_key: str, limit: int = 5, logger=None,
                 count = assets_data.get("total", len(assets_data.get("items", [])))
             else:
                 count = len(assets_data)
-
-            person_counts.append({
-                "id": person_id,
-                "name": person_name,
-                "asset_count": count
-            })
+            _api_cache_put(immich_url, api_key, f"count:{person_id}", count)
         except Exception as e:
-            if logger:
-                logger.warning(f"Could not count assets for {person_name}: {e}")
-            # Still include them with 0 count
-            person_counts.append({
-                "id": person_id,
-                "name": person_name,
-                "asset_count": 0
-            })
+            stale = _api_cache_get_stale(immich_url, api_key, f"count:{person_id}")
+            if stale is not None:
+                count = stale[0]
+                if logger:
+                    logger.warning(f"Could not count assets for {person_name} ({e}); "
+                                   f"using cached count from {stale[1] / 3600:.1f}h ago")
+            else:
+                if logger:
+                    logger.warning(f"Could not count assets for {person_name}: {e}")
+                # Still include them with 0 count
+                count = 0
+
+        return {
+            "id": person_id,
+            "name": person_name,
+            "asset_count": count
+        }
 
-    # Sort by asset count descending
-    person_counts.sort(key=lambda x: x["asset_count"], reverse=True)
+    if len(named_people) <= 1:
+        person_counts = [_count(p) for p in named_people]
+    else:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(named_people))) as pool:
+            person_counts = list(pool.map(_count, named_people))
 
-    top = person_counts[:limit]
+    # Top by asset count (same order as a stable descending sort + slice)
+    top = heapq.nlargest(limit, person_counts, key=itemgetter("asset_count"))
 
     if logger:
         logger.debug(f"Top {limit} named persons: {[(p['name'], p['asset_count']) for p in top]}")
@@ -273,9 +645,11 @@ def get_random_person_photo(
     exclude_days: int = 30,
     exclude_asset_ids: set = None,
     logger=None,
+    now: datetime = None,
 ) -> Optional[dict]:
     """
-    Get a random photo from one of the top persons, excluding recent photos.
+    Get a random photo from one of the top persons, excluding recent photos
+    (taken within exclude_days of now, default the current local time).
     Returns dict with 'asset', 'person_name', 'person_id' or None if no valid photos.
     """
     if not top_persons:
@@ -284,36 +658,41 @@ def get_random_person_photo(
     if exclude_asset_ids is None:
         exclude_asset_ids = set()
 
-    cutoff_date = datetime.now() - timedelta(days=exclude_days)
+    # ISO-8601 timestamps sort chronologically, so compare the first 19 chars
+    # ("YYYY-MM-DDTHH:MM:SS", wall-clock as returned) instead of parsing each
+    cutoff_iso = ((now or datetime.now()) - timedelta(days=exclude_days)).strftime("%Y-%m-%dT%H:%M:%S")
 
     # Shuffle persons to add randomness in which person we try first
     shuffled_persons = random.sample(top_persons, len(top_persons))
 
+    def _valid(assets):
+        # Filter out recent photos and already-used assets
+        valid_assets = []
+        for asset in assets:
+            if asset.get("id") in exclude_asset_ids:
+                continue
+            created_at = asset.get("fileCreatedAt") or asset.get("createdAt")
+            if isinstance(created_at, str) and created_at[:19] > cutoff_iso:
+                continue  # Too recent
+            valid_assets.append(asset)
+        return valid_assets
+
     for person in shuffled_persons:
         person_id = person["id"]
         person_name = person["name"]
 
         try:
-            assets = fetch_person_assets(immich_url, api_key, person_id)
-
-            # Filter out recent photos and already-used assets
+            # With a known count, one random small page is enough to pick from;
+            # fetch the full list only if that page has nothing usable
+            pages = -(-person.get("asset_count", 0) // PERSON_SAMPLE_PAGE_SIZE)
             valid_assets = []
-            for asset in assets:
-                asset_id = asset.get("id")
-                if asset_id in exclude_asset_ids:
-                    continue
-
-                # Check date
-                created_at = asset.get("fileCreatedAt") or asset.get("createdAt")
-                if created_at:
-                    try:
-                        asset_date = datetime.fromisoformat(created_at.replace("Z", "+00:00"))
-                        if asset_date.replace(tzinfo=None) > cutoff_date:
-                            continue  # Too recent
-                    except (ValueError, TypeError):
-                        pass
-
-                valid_assets.append(asset)
+            if pages > 1:
+                valid_assets = _valid(fetch_person_assets(
+                    immich_url, api_key, person_id,
+                    size=PERSON_SAMPLE_PAGE_SIZE, page=random.randint(1, pages),
+                ))
+            if not valid_assets:
+                valid_assets = _valid(fetch_person_assets(immich_url, api_key, person_id))
 
             if valid_assets:
                 chosen = random.choice(valid_assets)
@@ -336,12 +715,15 @@ def get_asset_people(immich_url: str, api_key: str, asset_id: str, timeout: int
     """Get people recognized in a specific asset.
 
     Returns list of face dicts with normalized (0-1) bounding box coordinates.
-    Uses the cached asset-details fetch (same endpoint) to avoid repeated calls.
+    Served from the asset details cache, since the same asset is checked by
+    face preference, collages, trips and Then & Now.
     """
     asset_data = fetch_asset_details(immich_url, api_key, asset_id, timeout=timeout)
-    people = asset_data.get("people", [])
+    return faces_from_people(asset_data.get("people", []))
 
-    # Extract face bounding boxes and normalize to 0-1 range
+
+def faces_from_people(people: list) -> list:
+    """Flatten an asset's "people" array into face dicts with 0-1 bounding boxes."""
     faces = []
     for person in people:
         for face in person.get("faces", []):
@@ -359,43 +741,54 @@ def get_asset_people(immich_url: str, api_key: str, asset_id: str, timeout: int
     return faces
 
 
-# Asset details cache (per-session, capped at 500 entries)
+# Asset details cache: key -> (fetched_at, data), capped at 500 entries. The
+# TTL lets long-lived processes (dashboard, --daemon) pick up face tags and
+# album changes made in Immich.
 _CACHE_MAX = 500
+ASSET_DETAILS_CACHE_TTL = 600  # seconds
 _asset_details_cache = {}
 
 
 def fetch_asset_details(immich_url: str, api_key: str, asset_id: str, timeout: int = 10) -> dict:
     """
     Fetch full asset details including exifInfo, albums, and people.
-    Results are cached for the session to avoid repeated API calls.
+    Results are reused for ASSET_DETAILS_CACHE_TTL seconds to avoid repeated
+    API calls; the returned dict is shared and must not be mutated.
     """
-    cache_key = f"{immich_url}:{api_key[:8]}:{asset_id}"
-    if cache_key in _asset_details_cache:
-        return _asset_details_cache[cache_key]
+    cache_key = f"{immich_url}:{_key_id(api_key)}:{asset_id}"
+    cached = _asset_details_cache.get(cache_key)
+    if cached and time.monotonic() - cached[0] < ASSET_DETAILS_CACHE_TTL:
+        return cached[1]
 
     headers = {"Accept": "application/json", "x-api-key": api_key}
-    response = requests.get(f"{immich_url}/api/assets/{asset_id}", headers=headers, timeout=timeout)
+    response = session.get(f"{immich_url}/api/assets/{asset_id}", headers=headers, timeout=timeout)
     response.raise_for_status()
-    asset_data = response.json()
+    asset_data = json_loads(response.content)
 
     if len(_asset_details_cache) >= _CACHE_MAX:
         _asset_details_cache.clear()
-    _asset_details_cache[cache_key] = asset_data
+    _asset_details_cache[cache_key] = (time.monotonic(), asset_data)
     return asset_data
 
 
 def select_asset_with_face_preference(
     assets: list,
-    top_person_ids: set,
+    top_person_ids: Union[set, Callable[[], set]],
     immich_url: str,
     api_key: str,
     exclude_asset_ids: set = None,
     logger=None,
     prefer_groups: bool = False,
     min_group_size: int = 2,
+    max_workers: int = MAX_FANOUT_WORKERS,
 ) -> Optional[dict]:
     """
     Select an asset preferring those with recognized faces from top persons.
+    Face lookups run concurrently (up to max_workers at once).
+
+    top_person_ids may be a callable returning the set, so the per-person
+    count queries behind it only run when there is a real choice: more than
+    one candidate and at least one of them with a named face.
 
     When prefer_groups is False (default):
     Priority: 1) Has top person face, 2) Has any named face, 3) Random
@@ -420,6 +813,16 @@ def select_asset_with_face_preference(
     available = [a for a in assets if a.get("id") not in exclude_asset_ids]
     if not available:
         return None
+    if len(available) == 1:
+        return available[0]
+
+    top_ids = None if callable(top_person_ids) else top_person_ids
+
+    def _top_ids() -> set:
+        nonlocal top_ids
+        if top_ids is None:
+            top_ids = set(top_person_ids())
+        return top_ids
 
     # Categorize assets with face counts
     group_top_persons = []      # Multiple top persons
@@ -428,40 +831,62 @@ def select_asset_with_face_preference(
     single_named = []           # One named face
     without_face = []           # No faces
 
-    for asset in available:
-        asset_id = asset.get("id")
-        if not asset_id:
-            continue
-
+    def _lookup(asset):
+        # Assets from endpoints that embed people (e.g. search with
+        # withPeople) need no extra request. An empty list may just mean
+        # people weren't loaded, so only a non-empty one is trusted.
+        if asset.get("people"):
+            return asset, faces_from_people(asset["people"])
         try:
-            people = get_asset_people(immich_url, api_key, asset_id)
-            # Deduplicate by person ID (a person may have multiple faces detected)
-            seen_ids = set()
-            named_people = []
-            for p in people:
-                pid = p.get("id")
-                if p.get("name") and pid not in seen_ids:
-                    seen_ids.add(pid)
-                    named_people.append(p)
-            top_people = [p for p in named_people if p.get("id") in top_person_ids]
-
-            top_count = len(top_people)
-            named_count = len(named_people)
-
-            if top_count >= min_group_size:
-                group_top_persons.append(asset)
-            elif named_count >= min_group_size:
-                group_named.append(asset)
-            elif top_count > 0:
-                single_top_person.append(asset)
-            elif named_count > 0:
-                single_named.append(asset)
-            else:
-                without_face.append(asset)
+            return asset, get_asset_people(immich_url, api_key, asset["id"])
         except Exception as e:
-            if logger:
-                logger.debug(f"Could not check faces for asset {asset_id}: {e}")
-            without_face.append(asset)
+            return asset, e
+
+    # Face lookups are independent GETs, so run them concurrently, one batch
+    # of max_workers at a time. Candidates are shuffled so stopping at the
+    # first batch that fills the top-priority bucket still picks uniformly
+    # among those assets; most memory years have one, so the remaining
+    # lookups are skipped.
+    candidates = [a for a in available if a.get("id")]
+    random.shuffle(candidates)
+    batch_size = max(1, max_workers)
+
+    with ThreadPoolExecutor(max_workers=max(1, min(batch_size, len(candidates)))) as pool:
+        for start in range(0, len(candidates), batch_size):
+            for asset, people in pool.map(_lookup, candidates[start:start + batch_size]):
+                if isinstance(people, Exception):
+                    if logger:
+                        logger.debug(f"Could not check faces for asset {asset['id']}: {people}")
+                    without_face.append(asset)
+                    continue
+
+                # Deduplicate by person ID (a person may have multiple faces detected)
+                seen_ids = set()
+                named_people = []
+                for p in people:
+                    pid = p.get("id")
+                    if p.get("name") and pid not in seen_ids:
+                        seen_ids.add(pid)
+                        named_people.append(p)
+                top_people = [p for p in named_people if p.get("id") in _top_ids()] if named_people else []
+
+                top_count = len(top_people)
+                named_count = len(named_people)
+
+                if top_count >= min_group_size:
+                    group_top_persons.append(asset)
+                elif named_count >= min_group_size:
+                    group_named.append(asset)
+                elif top_count > 0:
+                    single_top_person.append(asset)
+                elif named_count > 0:
+                    single_named.append(asset)
+                else:
+                    without_face.append(asset)
+
+            best_found = group_top_persons if prefer_groups else (group_top_persons or single_top_person)
+            if best_found:
+                break
 
     # Select by priority
     if prefer_groups:
@@ -523,22 +948,22 @@ def get_or_create_album(immich_url: str, api_key: str, album_name: str, logger:
         headers = {"Accept": "application/json", "x-api-key": api_key}
 
         # List existing albums
-        response = requests.get(f"{immich_url}/api/albums", headers=headers, timeout=30)
+        response = session.get(f"{immich_url}/api/albums", headers=headers, timeout=30)
         if response.status_code == 200:
-            albums = response.json()
+            albums = json_loads(response.content)
             for album in albums:
                 if album.get("albumName") == album_name:
                     return album.get("id")
 
         # Create new album
-        response = requests.post(
+        response = session.post(
             f"{immich_url}/api/albums",
             headers=headers,
             json={"albumName": album_name, "description": "Weekly highlights collage"},
             timeout=30,
         )
         if response.status_code in (200, 201):
-            return response.json().get("id")
+            return json_loads(response.content).get("id")
         else:
             logger.warning(f"Failed to create album '{album_name}': {response.status_code}")
             return None
@@ -554,9 +979,9 @@ def get_album_assets(
     """Fetch all assets from a named album. Returns dict with album_id, album_name, assets or None."""
     headers = {"Accept": "application/json", "x-api-key": api_key}
     try:
-        response = requests.get(f"{immich_url}/api/albums", headers=headers, timeout=30)
+        response = session.get(f"{immich_url}/api/albums", headers=headers, timeout=30)
         response.raise_for_status()
-        albums = response.json()
+        albums = json_loads(response.content)
         album_id = None
         for album in albums:
             if album.get("albumName") == album_name:
@@ -567,9 +992,9 @@ def get_album_assets(
                 logger.debug(f"Album '{album_name}' not found")
             return None
 
-        response = requests.get(f"{immich_url}/api/albums/{album_id}", headers=headers, timeout=30)
+        response = session.get(f"{immich_url}/api/albums/{album_id}", headers=headers, timeout=30)
         response.raise_for_status()
-        data = response.json()
+        data = json_loads(response.content)
         return {
             "album_id": album_id,
             "album_name": album_name,
@@ -603,7 +1028,7 @@ def upload_collage_to_album(
             "fileModifiedAt": now_iso,
         }
 
-        response = requests.post(
+        response = session.post(
             f"{immich_url}/api/assets",
             headers=headers,
             files=files,
@@ -615,13 +1040,13 @@ def upload_collage_to_album(
             logger.warning(f"Failed to upload collage: {response.status_code}")
             return None
 
-        asset_id = response.json().get("id")
+        asset_id = json_loads(response.content).get("id")
         if not asset_id:
             return None
 
         # Add to album via PUT /api/albums/{id}/assets
         add_headers = {"Accept": "application/json", "x-api-key": api_key, "Content-Type": "application/json"}
-        response = requests.put(
+        response = session.put(
             f"{immich_url}/api/albums/{album_id}/assets",
             headers=add_headers,
             json={"ids": [asset_id]},
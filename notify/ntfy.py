@@ -1,38 +1,103 @@
-"""ntfy API: upload images, send notifications."""
+"""ntfy API: send notifications with image attachments."""
 
+import base64
 import logging
-import uuid
+import threading
+import time
+from io import BytesIO
 
-import requests
+from PIL import Image
 
-from .immich import fetch_thumbnail
-from .utils import with_retry
+from .immich import ThumbnailDiskWriter, cached_thumbnail, fetch_thumbnail, open_thumbnail_stream
+from .utils import json_loads, session, with_retry
 
 
-def upload_image_to_ntfy(ntfy_url: str, image_data: bytes, auth: tuple = None, timeout: int = 30, ntfy_external_url: str = None) -> str | None:
-    """Upload an image to ntfy and return the URL."""
+class _SizedReader:
+    """File-like wrapper that gives requests a length for a streamed body.
+
+    Without __len__ requests falls back to chunked transfer encoding; with it
+    the upload is sent with a plain Content-Length and read in blocks. Each
+    block is also passed to on_chunk, if given.
+    """
+
+    def __init__(self, raw, length: int, on_chunk=None):
+        self._raw = raw
+        self._length = length
+        self._on_chunk = on_chunk
+
+    def __len__(self):
+        return self._length
+
+    def read(self, size: int = -1) -> bytes:
+        data = self._raw.read(size)
+        if data and self._on_chunk is not None:
+            self._on_chunk(data)
+        return data
+
+
+def _encode_header(value: str) -> str:
+    """Encode a header value as RFC 2047 if it isn't plain single-line ASCII."""
+    if value.isascii() and "\r" not in value and "\n" not in value:
+        return value
+    return f"=?UTF-8?B?{base64.b64encode(value.encode('utf-8')).decode('ascii')}?="
+
+
+# Attachment URLs already on the ntfy server, keyed by
+# (ntfy_url, immich_url, asset_id) -> (url, expires_at). When several users get
+# the same asset (shared libraries, family accounts), later ones attach the
+# existing file instead of downloading and uploading the thumbnail again.
+# Entries stop being used a few minutes before ntfy expires the file.
+ATTACHMENT_EXPIRY_MARGIN = 300  # seconds
+_attachment_cache: dict = {}
+_attachment_cache_lock = threading.Lock()
+
+
+def cached_attachment_url(ntfy_url: str, attachment_key: tuple) -> str | None:
+    """Return a still-valid ntfy attachment URL for attachment_key, or None."""
+    with _attachment_cache_lock:
+        entry = _attachment_cache.get((ntfy_url, *attachment_key))
+    if entry and entry[1] - ATTACHMENT_EXPIRY_MARGIN > time.time():
+        return entry[0]
+    return None
+
+
+def _remember_attachment(ntfy_url: str, attachment_key: tuple, attachment: dict):
+    url, expires = attachment.get("url"), attachment.get("expires")
+    if not url or not expires:
+        return
+    now = time.time()
+    with _attachment_cache_lock:
+        for key in [k for k, (_, exp) in _attachment_cache.items() if exp <= now]:
+            del _attachment_cache[key]
+        _attachment_cache[(ntfy_url, *attachment_key)] = (url, expires)
+
+
+def _check_attachment(response, ntfy_external_url: str = None) -> dict:
+    """Warn if ntfy accepted the image but its attachment URL looks unusable.
+
+    Returns the attachment info from the response ({} if there is none).
+    """
     logger = logging.getLogger("immich-memories-notify")
-    temp_topic = f"upload-{uuid.uuid4().hex[:12]}"
-    url = f"{ntfy_url}/{temp_topic}"
-
-    headers = {"Filename": "memory.jpg"}
-    response = requests.put(url, headers=headers, data=image_data, auth=auth, timeout=timeout)
-
-    if response.status_code == 200:
-        data = response.json()
-        attachment = data.get("attachment", {})
-        attachment_url = attachment.get("url")
-        if not attachment_url:
-            logger.warning("ntfy upload returned 200 but no attachment URL — check that NTFY_BASE_URL and NTFY_ATTACHMENT_CACHE_SIZE are set on your ntfy server")
-        else:
-            logger.debug(f"Attachment URL: {attachment_url}")
-            if ntfy_external_url and not attachment_url.startswith(ntfy_external_url):
-                logger.warning(
-                    f"Attachment URL ({attachment_url}) does not match NTFY_EXTERNAL_URL ({ntfy_external_url}) — "
-                    "thumbnails may not display on your phone. Check that base-url in your ntfy server.yaml matches NTFY_EXTERNAL_URL"
-                )
-        return attachment_url
+    try:
+        attachment = json_loads(response.content).get("attachment") or {}
+    except ValueError:
+        return {}
+    attachment_url = attachment.get("url")
+    if not attachment_url:
+        logger.warning("ntfy upload returned 200 but no attachment URL — check that NTFY_BASE_URL and NTFY_ATTACHMENT_CACHE_SIZE are set on your ntfy server")
+    else:
+        logger.debug(f"Attachment URL: {attachment_url}")
+        if ntfy_external_url and not attachment_url.startswith(ntfy_external_url):
+            logger.warning(
+                f"Attachment URL ({attachment_url}) does not match NTFY_EXTERNAL_URL ({ntfy_external_url}) — "
+                "thumbnails may not display on your phone. Check that base-url in your ntfy server.yaml matches NTFY_EXTERNAL_URL"
+            )
+    return attachment
+
 
+def _warn_attachment_rejected(response, topic: str):
+    """Explain why ntfy refused an image attachment."""
+    logger = logging.getLogger("immich-memories-notify")
     body = response.text[:200]
     if "attachments not allowed" in body.lower():
         logger.warning(
@@ -50,7 +115,33 @@ def upload_image_to_ntfy(ntfy_url: str, image_data: bytes, auth: tuple = None, t
         )
     else:
         logger.warning(f"ntfy upload failed: {response.status_code} — {body}")
-    return None
+    logger.warning(f"Thumbnail upload failed for topic '{topic}' — notification will be sent without preview")
+
+
+# Images bigger than this are re-encoded as WebP before being sent to ntfy.
+# Immich thumbnails are far below it; it catches the generated collages and
+# Then & Now composites (1080px JPEG at q90-95), which shrink by more than half.
+COMPRESS_ABOVE_BYTES = 256 * 1024
+
+
+def compress_for_ntfy(image_data: bytes) -> tuple[bytes, str]:
+    """Return (data, filename) for an image attachment, WebP-compressed if large.
+
+    The original is returned when it's small, can't be decoded, or the WebP
+    isn't actually smaller.
+    """
+    if len(image_data) <= COMPRESS_ABOVE_BYTES:
+        return image_data, "memory.jpg"
+    try:
+        with Image.open(BytesIO(image_data)) as img:
+            buf = BytesIO()
+            img.convert("RGB").save(buf, format="WEBP", quality=80, method=4)
+    except Exception:
+        return image_data, "memory.jpg"
+    compressed = buf.getvalue()
+    if len(compressed) >= len(image_data):
+        return image_data, "memory.jpg"
+    return compressed, "memory.webp"
 
 
 def _sanitize_header(value: str) -> str:
@@ -63,14 +154,25 @@ def send_notification(
     topic: str,
     title: str,
     message: str,
-    thumbnail_data: bytes = None,
+    thumbnail_data=None,
     click_url: str = None,
     auth: tuple = None,
     timeout: int = 10,
     is_video: bool = False,
     ntfy_external_url: str = None,
+    attachment_key: tuple = None,
+    filename: str = "memory.jpg",
 ) -> bool:
-    """Send a notification to ntfy."""
+    """Send a notification to ntfy.
+
+    With thumbnail_data (bytes or a sized file-like object) the image is PUT
+    to the topic as the attachment and the text goes in the Message header,
+    so the whole notification is a single request. If ntfy refuses the
+    attachment, the notification is sent again as text only.
+
+    attachment_key identifies the image (see cached_attachment_url): if ntfy
+    already has it, it is attached by URL and thumbnail_data is not sent.
+    """
     topic = _sanitize_header(topic)
     title = _sanitize_header(title)
     url = f"{ntfy_url}/{topic}"
@@ -78,18 +180,8 @@ def send_notification(
     # Use different tags for videos
     tags = "movie,calendar" if is_video else "camera,calendar"
 
-    # Encode title for HTTP header (RFC 2047 for non-ASCII)
-    try:
-        # Try ASCII encoding first (fast path)
-        title.encode('ascii')
-        encoded_title = title
-    except UnicodeEncodeError:
-        # Contains non-ASCII, use base64 encoding for header
-        import base64
-        encoded_title = f"=?UTF-8?B?{base64.b64encode(title.encode('utf-8')).decode('ascii')}?="
-
     headers = {
-        "Title": encoded_title,
+        "Title": _encode_header(title),  # RFC 2047 for non-ASCII
         "Tags": tags,
         "Priority": "default",
     }
@@ -97,21 +189,50 @@ def send_notification(
     if click_url:
         headers["Click"] = _sanitize_header(click_url)
 
-    # Upload thumbnail and attach it
-    if thumbnail_data:
-        image_url = upload_image_to_ntfy(ntfy_url, thumbnail_data, auth=auth, ntfy_external_url=ntfy_external_url)
-        if image_url:
-            headers["Attach"] = image_url
-        else:
-            logging.getLogger("immich-memories-notify").warning(
-                f"Thumbnail upload failed for topic '{topic}' — notification will be sent without preview ({len(thumbnail_data):,} bytes attempted)"
-            )
+    attach_url = cached_attachment_url(ntfy_url, attachment_key) if attachment_key else None
+    if attach_url:
+        headers["Attach"] = attach_url
+    elif thumbnail_data:
+        attach_headers = dict(headers, Filename=filename, Message=_encode_header(message))
+        response = session.put(url, headers=attach_headers, data=thumbnail_data, auth=auth, timeout=timeout)
+        if response.status_code == 200:
+            attachment = _check_attachment(response, ntfy_external_url)
+            if attachment_key:
+                _remember_attachment(ntfy_url, attachment_key, attachment)
+            return True
+        _warn_attachment_rejected(response, topic)
 
-    response = requests.post(url, headers=headers, data=message.encode("utf-8"), auth=auth, timeout=timeout)
+    response = session.post(url, headers=headers, data=message.encode("utf-8"), auth=auth, timeout=timeout)
     response.raise_for_status()
     return True
 
 
+def stream_thumbnail_to_ntfy(
+    immich_url: str,
+    api_key: str,
+    asset_id: str,
+    timeout: int = 30,
+    **send_kwargs,
+) -> bool:
+    """Send a notification whose attachment is piped straight from Immich.
+
+    The image is never held in memory as a whole; it is copied into the
+    on-disk thumbnail cache as it streams by. Raises on Immich or network
+    errors so the caller can fall back to a buffered fetch with retry.
+    """
+    response, content_length = open_thumbnail_stream(immich_url, api_key, asset_id, timeout=timeout)
+    disk_copy = ThumbnailDiskWriter(immich_url, asset_id, content_length)
+    try:
+        with response:
+            return send_notification(
+                thumbnail_data=_SizedReader(response.raw, content_length, on_chunk=disk_copy.write),
+                timeout=timeout,
+                **send_kwargs,
+            )
+    finally:
+        disk_copy.close()
+
+
 def send_single_notification(
     user: dict,
     notification: dict,
@@ -134,53 +255,74 @@ def send_single_notification(
     retry_config = config["settings"]["retry"]
     api_key = user["immich_api_key"]
 
+    # Use pre-built click_url from notification (e.g. Then & Now links to "now" photo)
+    # or build from asset_id
+    click_url = notification.get("click_url")
+    if not click_url and click_base:
+        if asset_id:
+            click_url = f"{click_base}/photos/{asset_id}"
+        else:
+            click_url = f"{click_base}/"
+    send_kwargs = {
+        "ntfy_url": ntfy_url,
+        "topic": topic,
+        "title": notification["title"],
+        "message": notification["message"],
+        "click_url": click_url,
+        "auth": ntfy_auth,
+        "is_video": notification.get("is_video", False),
+        "ntfy_external_url": ntfy_external_url,
+    }
+
     # Fetch thumbnail with retry
     # If a thumbnail_override is provided and preferred (e.g. Then & Now composite), use it directly.
     # Otherwise fetch from Immich and fall back to override on failure.
     thumbnail_data = None
+    attachment_key = (immich_url, asset_id) if asset_id else None
     if thumbnail_override and not asset_id:
         # No asset to fetch — use override directly (Then & Now, failed collage upload, etc.)
         thumbnail_data = thumbnail_override
+    elif asset_id and cached_attachment_url(ntfy_url, attachment_key):
+        # Another user's notification already put this image on ntfy
+        logger.debug(f"  [{name}] Reusing ntfy attachment for {asset_id}")
     elif asset_id:
-        try:
-            thumbnail_data = with_retry(
-                lambda: fetch_thumbnail(immich_url, api_key, asset_id),
-                max_attempts=retry_config["max_attempts"],
-                delay=retry_config["delay_seconds"],
-                logger=logger,
-            )
-            logger.debug(f"  [{name}] Thumbnail: {len(thumbnail_data):,} bytes")
-        except Exception as e:
-            logger.warning(f"  [{name}] Could not fetch thumbnail: {e}")
-            if thumbnail_override:
-                thumbnail_data = thumbnail_override
-                logger.debug(f"  [{name}] Using fallback thumbnail: {len(thumbnail_data):,} bytes")
+        thumbnail_data = cached_thumbnail(immich_url, api_key, asset_id)
+        if thumbnail_data is None:
+            # Pipe the thumbnail from Immich straight into the ntfy request;
+            # only fall back to the buffered fetch (with retry) if that fails.
+            try:
+                return stream_thumbnail_to_ntfy(immich_url, api_key, asset_id, attachment_key=attachment_key, **send_kwargs)
+            except Exception as e:
+                logger.debug(f"  [{name}] Streaming thumbnail failed ({e}), retrying buffered")
+            try:
+                thumbnail_data = with_retry(
+                    lambda: fetch_thumbnail(immich_url, api_key, asset_id),
+                    max_attempts=retry_config["max_attempts"],
+                    delay=retry_config["delay_seconds"],
+                    logger=logger,
+                )
+                logger.debug(f"  [{name}] Thumbnail: {len(thumbnail_data):,} bytes")
+            except Exception as e:
+                logger.warning(f"  [{name}] Could not fetch thumbnail: {e}")
+                attachment_key = None
+                if thumbnail_override:
+                    thumbnail_data = thumbnail_override
+                    logger.debug(f"  [{name}] Using fallback thumbnail: {len(thumbnail_data):,} bytes")
     elif thumbnail_override:
         thumbnail_data = thumbnail_override
 
+    # Compress once up front, not on every retry
+    filename = "memory.jpg"
+    if thumbnail_data:
+        original_size = len(thumbnail_data)
+        thumbnail_data, filename = compress_for_ntfy(thumbnail_data)
+        if len(thumbnail_data) != original_size:
+            logger.debug(f"  [{name}] Compressed attachment: {original_size:,} -> {len(thumbnail_data):,} bytes")
+
     # Send notification with retry
     try:
-        # Use pre-built click_url from notification (e.g. Then & Now links to "now" photo)
-        # or build from asset_id
-        click_url = notification.get("click_url")
-        if not click_url and click_base:
-            if asset_id:
-                click_url = f"{click_base}/photos/{asset_id}"
-            else:
-                click_url = f"{click_base}/"
-        is_video = notification.get("is_video", False)
         success = with_retry(
-            lambda: send_notification(
-                ntfy_url=ntfy_url,
-                topic=topic,
-                title=notification["title"],
-                message=notification["message"],
-                thumbnail_data=thumbnail_data,
-                click_url=click_url,
-                auth=ntfy_auth,
-                is_video=is_video,
-                ntfy_external_url=ntfy_external_url,
-            ),
+            lambda: send_notification(thumbnail_data=thumbnail_data, attachment_key=attachment_key, filename=filename, **send_kwargs),
             max_attempts=retry_config["max_attempts"],
             delay=retry_config["delay_seconds"],
             logger=logger,
@@ -1,11 +1,11 @@
 """Check for new releases on GitHub and notify the admin."""
 
+import base64
 import logging
 from pathlib import Path
 
-import requests
-
 from .config import load_state, save_state, load_config
+from .utils import json_loads, session
 
 GITHUB_REPO = "ismaildakrory/immich-memories-notify"
 RELEASES_URL = f"https://api.github.com/repos/{GITHUB_REPO}/releases/latest"
@@ -45,7 +45,7 @@ def check_for_updates(config_path: str = "config.yaml", logger: logging.Logger =
     logger.info(f"Checking for updates (current: v{current_version})...")
 
     try:
-        resp = requests.get(RELEASES_URL, timeout=10, headers={"Accept": "application/vnd.github.v3+json"})
+        resp = session.get(RELEASES_URL, timeout=10, headers={"Accept": "application/vnd.github.v3+json"})
         if resp.status_code == 404:
             logger.info("No releases found on GitHub yet")
             return
@@ -54,7 +54,7 @@ def check_for_updates(config_path: str = "config.yaml", logger: logging.Logger =
         logger.warning(f"Could not check for updates: {e}")
         return
 
-    data = resp.json()
+    data = json_loads(resp.content)
     latest_tag = data.get("tag_name", "")
     release_name = data.get("name", latest_tag)
     latest_version = latest_tag.lstrip("v")
@@ -103,7 +103,6 @@ def check_for_updates(config_path: str = "config.yaml", logger: logging.Logger =
         try:
             title.encode('ascii')
         except UnicodeEncodeError:
-            import base64
             title_encoded = f"=?UTF-8?B?{base64.b64encode(title.encode('utf-8')).decode('ascii')}?="
 
         headers = {
@@ -113,7 +112,7 @@ def check_for_updates(config_path: str = "config.yaml", logger: logging.Logger =
             "Click": f"https://github.com/{GITHUB_REPO}/releases/latest",
         }
 
-        resp = requests.post(
+        resp = session.post(
             f"{ntfy_url}/{topic}",
             headers=headers,
             data=message.encode("utf-8"),
@@ -1,22 +1,219 @@
-"""Utility functions: retry logic, location formatting, delay calculation."""
+"""Utility functions: HTTP session, JSON, retry logic, location formatting, delay calculation."""
 
+import json
 import random
+import threading
 import time
 from datetime import datetime, timedelta
+from urllib.parse import urlsplit
 
+import requests
+from requests.adapters import HTTPAdapter
 
-def with_retry(func, max_attempts: int = 3, delay: int = 5, logger=None):
-    """Execute function with retry logic."""
+try:
+    import orjson
+except ImportError:  # optional speedup; stdlib json works the same, just slower
+    orjson = None
+
+
+class CircuitOpenError(requests.ConnectionError):
+    """Raised instead of sending a request to a host whose circuit is open."""
+
+
+class CircuitBreaker:
+    """Per-host circuit breaker (closed -> open -> half-open).
+
+    After fail_threshold consecutive failures (connection errors, timeouts,
+    5xx) the circuit opens and calls fail fast for reset_after seconds. Then
+    a single probe is let through: success closes the circuit, failure opens
+    it again. Thread-safe, since users are processed concurrently.
+    """
+
+    def __init__(self, fail_threshold: int = 5, reset_after: float = 60):
+        self.fail_threshold = fail_threshold
+        self.reset_after = reset_after
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def before_call(self, host: str):
+        """Raise CircuitOpenError unless a call may go through now."""
+        with self._lock:
+            if self._opened_at is None:
+                return
+            if self._probing or time.monotonic() - self._opened_at < self.reset_after:
+                raise CircuitOpenError(f"Circuit open for {host} after {self._failures} consecutive failures")
+            self._probing = True  # half-open: this caller is the probe
+
+    def record(self, ok: bool):
+        with self._lock:
+            self._probing = False
+            if ok:
+                self._failures = 0
+                self._opened_at = None
+            else:
+                self._failures += 1
+                if self._opened_at is not None or self._failures >= self.fail_threshold:
+                    self._opened_at = time.monotonic()
+
+
+# TCP connect timeout for every session request. Call sites pass a single
+# timeout= sized for the response (10-60 s); on its own that would also let an
+# unreachable host stall each attempt for the full value. Slightly above 3 s,
+# the TCP SYN retransmit interval, so one lost SYN doesn't fail the connect.
+CONNECT_TIMEOUT = 3.05
+
+
+class _BreakerAdapter(HTTPAdapter):
+    """HTTPAdapter that routes every request through its host's CircuitBreaker.
+
+    A scalar timeout is split into (CONNECT_TIMEOUT, timeout) so connecting
+    fails fast while slow responses keep their full read budget.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._breakers = {}
+        self._breakers_lock = threading.Lock()
+
+    def _breaker(self, host: str) -> CircuitBreaker:
+        with self._breakers_lock:
+            breaker = self._breakers.get(host)
+            if breaker is None:
+                breaker = self._breakers[host] = CircuitBreaker()
+            return breaker
+
+    def send(self, request, **kwargs):
+        timeout = kwargs.get("timeout")
+        if isinstance(timeout, (int, float)):
+            kwargs["timeout"] = (min(CONNECT_TIMEOUT, timeout), timeout)
+        host = urlsplit(request.url).netloc
+        breaker = self._breaker(host)
+        breaker.before_call(host)
+        try:
+            response = super().send(request, **kwargs)
+        except Exception:
+            breaker.record(ok=False)
+            raise
+        breaker.record(ok=response.status_code < 500)
+        return response
+
+
+# Upper bound on users processed at once in a slot run
+MAX_USER_WORKERS = 8
+# Upper bound on the requests one user fans out at once (person counts, face
+# lookups, thumbnail downloads); those steps run one after another per user
+MAX_FANOUT_WORKERS = 8
+# Connections one host can need at once: every user worker fanning out, plus
+# its background people fetch
+POOL_MAXSIZE = MAX_USER_WORKERS * (MAX_FANOUT_WORKERS + 1)
+
+# Shared HTTP session for Immich and ntfy calls: keeps TCP/TLS connections
+# alive between requests instead of reconnecting for every thumbnail/API call.
+# The per-host pool is sized for the worst-case concurrency above, so urllib3
+# never discards connections ("Connection pool is full"); retries are handled
+# by with_retry, not urllib3. When a host keeps failing, its circuit breaker
+# makes the remaining users fail fast instead of each one burning
+# max_attempts round trips on the outage.
+session = requests.Session()
+session.mount("http://", _BreakerAdapter(pool_connections=16, pool_maxsize=POOL_MAXSIZE, max_retries=0))
+session.mount("https://", _BreakerAdapter(pool_connections=16, pool_maxsize=POOL_MAXSIZE, max_retries=0))
+
+
+def json_loads(data):
+    """Parse JSON from bytes/str (orjson when installed).
+
+    Both backends raise a json.JSONDecodeError subclass on bad input.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def json_dumps(obj) -> bytes:
+    """Serialize obj as compact UTF-8 JSON."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def json_dumps_indented(obj) -> bytes:
+    """Serialize obj as 2-space indented UTF-8 JSON."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+
+
+# Set by the CLI's SIGTERM/SIGINT handler. Waits (the slot's random delay,
+# retry backoff in worker threads) use shutdown_requested.wait() instead of
+# time.sleep() so a shutdown isn't held up by a sleeping thread.
+shutdown_requested = threading.Event()
+
+# Cancel events of in-process runs (the dashboard's test trigger), registered
+# by run() so retry backoff also ends when such a run is cancelled.
+_cancel_events = set()
+_cancel_events_lock = threading.Lock()
+
+
+def watch_cancel(event: threading.Event):
+    """Make interruptible_wait() return early once event is set."""
+    with _cancel_events_lock:
+        _cancel_events.add(event)
+
+
+def unwatch_cancel(event: threading.Event):
+    with _cancel_events_lock:
+        _cancel_events.discard(event)
+
+
+def interruptible_wait(seconds: float) -> bool:
+    """Sleep up to seconds; True if a shutdown or a watched cancel cut it short."""
+    deadline = time.monotonic() + seconds
+    while True:
+        if any(event.is_set() for event in tuple(_cancel_events)):
+            return True
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        # Cancel events are polled; shutdown_requested wakes the wait at once
+        if shutdown_requested.wait(min(remaining, 0.5)):
+            return True
+
+
+def _is_permanent_error(error: Exception) -> bool:
+    """True for errors that retrying can't fix: an open circuit, or HTTP 4xx
+    other than 408/429."""
+    if isinstance(error, CircuitOpenError):
+        return True
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        status = error.response.status_code
+        return 400 <= status < 500 and status not in (408, 429)
+    return False
+
+
+def with_retry(func, max_attempts: int = 3, delay: int = 5, logger=None, max_delay: int = 60):
+    """Execute function with retry logic.
+
+    Waits use exponential backoff with full jitter: before retry n the sleep is
+    uniform in [0, min(max_delay, delay * 2**(n-1))], so users hitting the
+    same outage don't retry in lockstep. Client errors such as 401/404 and
+    CircuitOpenError are raised immediately instead of burning attempts, and
+    a pending shutdown or run cancel ends the backoff with the last error.
+    """
     last_error = None
     for attempt in range(1, max_attempts + 1):
         try:
             return func()
         except Exception as e:
             last_error = e
+            if _is_permanent_error(e):
+                raise
             if logger:
                 logger.warning(f"Attempt {attempt}/{max_attempts} failed: {e}")
             if attempt < max_attempts:
-                time.sleep(delay)
+                if interruptible_wait(random.uniform(0, min(max_delay, delay * 2 ** (attempt - 1)))):
+                    break
     raise last_error
 
 
@@ -60,17 +257,19 @@ def get_primary_album(asset_details: dict) -> str | None:
     return None
 
 
-def calculate_random_delay(window_start: str, window_end: str, test_mode: bool = False) -> int:
+def calculate_random_delay(window_start: str, window_end: str, test_mode: bool = False, now: datetime = None) -> int:
     """
     Calculate random delay in seconds within a time window.
     window_start/window_end format: "HH:MM"
+    now defaults to the current local time (read once).
     Returns seconds to sleep.
     """
     if test_mode:
         # In test mode, use 1-5 second delay
         return random.randint(1, 5)
 
-    now = datetime.now()
+    if now is None:
+        now = datetime.now()
 
     # Parse window times
     start_hour, start_min = map(int, window_start.split(":"))